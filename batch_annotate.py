@@ -0,0 +1,165 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+import click
+import cv2
+import numpy as np
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v")
+
+# Per worker process state, created once by _init_worker
+_hand_detector = None
+_recognizer = None
+
+
+def _init_worker(model_path: str, template_path: Optional[str]):
+    global _hand_detector, _recognizer
+    cv2.setNumThreads(1)  # One process per core already, avoid oversubscription
+    from pointing_input.hand_detector import HandDetector
+    from recognizer.recognizer import Recognizer, DEFAULT_TEMPLATE_PATH
+    _hand_detector = HandDetector(model_path)
+    _recognizer = Recognizer(template_path=template_path or DEFAULT_TEMPLATE_PATH)
+
+
+def _collect_strokes(video_path: str, flip: bool) -> Tuple[List[Dict], float]:
+    """Run detection and the MouseMapper touch logic over a video and return the pinch delimited fingertip strokes.
+
+    MouseMapper only decides when a stroke begins, moves and ends. Its stroke points follow the palm centroid (which
+    steers the pointer), so the collector records the midpoint of index and thumb tip of the tracked hand instead.
+    """
+    from pointing_input.hand_detector import INDEX_FINGER_TIP, THUMB_TIP
+    from pointing_input.mouse_mapper import MouseMapper, StrokeListener
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"'{video_path}' could not be opened as a video.")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    frame_index = 0
+    tracked_hand = None
+    strokes: List[Dict] = []
+    frame_scale = np.array([width, height], dtype=np.float32)
+
+    class StrokeCollector(StrokeListener):
+        def __init__(self):
+            self.current: Optional[Dict] = None
+
+        def _add_fingertip_point(self):
+            # Frames where the hand dropped out are skipped instead of mixing in palm centroid points
+            if self.current is None or tracked_hand is None:
+                return
+            x, y = tracked_hand.landmarks[[INDEX_FINGER_TIP, THUMB_TIP], :2].mean(axis=0) * frame_scale
+            self.current["points"].append((float(x), float(y)))
+            self.current["frames"].append(frame_index)
+
+        def stroke_begin(self, x: float, y: float):
+            self.current = {"start_frame": frame_index, "points": [], "frames": []}
+            self._add_fingertip_point()
+
+        def stroke_move(self, x: float, y: float):
+            self._add_fingertip_point()
+
+        def stroke_end(self, x: float, y: float):
+            if self.current:
+                self.current["end_frame"] = frame_index
+                strokes.append(self.current)
+                self.current = None
+
+    mouse = MouseMapper(width, height, inject_mouse=False)
+    mouse.add_stroke_listener(StrokeCollector())
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if flip:
+            frame = cv2.flip(frame, 1)
+            right, left = _hand_detector.detect_landmarks(frame) # ! Left and right are swapped due to the frame flipping
+        else:
+            left, right = _hand_detector.detect_landmarks(frame)
+        tracked_hand = right
+        mouse.process(left, right, use_right=True, now=frame_index / fps)
+        frame_index += 1
+    if frame_index == 0:
+        cap.release()
+        raise ValueError(f"'{video_path}' contains no readable frames.")
+    # Close a stroke that is still open at the end of the video by flushing the touch smoothing window
+    tracked_hand = None
+    for _ in range(len(mouse.touch_state_window)):
+        mouse.process(None, None, use_right=True, now=frame_index / fps)
+    cap.release()
+    return strokes, fps
+
+
+def annotate_video(video_path: str, video_dir: str, output_dir: str, flip: bool) -> Tuple[str, int, float]:
+    """Write a JSON lines event log with one labeled gesture per pinch stroke. Runs inside a worker process.
+    Raises ValueError for videos that can't be opened or decoded, no log is written for them.
+
+    The log mirrors the video's path relative to video_dir, so videos with the same name in different folders don't collide.
+    """
+    start = time.perf_counter()
+    strokes, fps = _collect_strokes(video_path, flip)
+    rel_path = os.path.relpath(video_path, video_dir)
+    log_path = os.path.join(output_dir, os.path.splitext(rel_path)[0] + ".jsonl")
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    with open(log_path, "w", encoding="utf-8") as f:
+        for stroke in strokes:
+            points = np.array(stroke["points"], dtype=float)
+            # Frame coordinates are top-left based like the template datasets, no flip needed
+            label, confidence = None, 0.0
+            if len(points) > 1 and np.ptp(points, axis=0).max() > 0:
+                label, _, _, confidence = _recognizer.recognize(points)
+            event = {
+                "video": rel_path,
+                "start_frame": stroke["start_frame"],
+                "end_frame": stroke["end_frame"],
+                "start_s": round(stroke["start_frame"] / fps, 3),
+                "end_s": round(stroke["end_frame"] / fps, 3),
+                "num_points": len(points),
+                "label": label,
+                "confidence": round(float(confidence), 4),
+            }
+            f.write(json.dumps(event) + "\n")
+    return log_path, len(strokes), time.perf_counter() - start
+
+
+@click.command()
+@click.argument("video_dir", type=click.Path(exists=True, file_okay=False))
+@click.option("--output-dir", "-o", default=None, help="Directory for the event logs (defaults to the video directory)", type=click.Path(file_okay=False))
+@click.option("--workers", "-j", default=os.cpu_count(), help="Number of worker processes", type=int, show_default=True)
+@click.option("--model-path", default="pointing_input/gesture_recognizer.task", help="Mediapipe gesture recognizer model", show_default=True)
+@click.option("--template-path", default=None, help="Template directory for the recognizer (defaults to datasets/xml_logs)")
+@click.option("--no-flip", is_flag=True, help="Don't mirror frames (use for footage that is already mirrored)")
+def main(video_dir: str, output_dir: Optional[str], workers: int, model_path: str, template_path: Optional[str], no_flip: bool) -> None:
+    """Annotate every video in VIDEO_DIR with the gestures drawn by pinching index finger and thumb."""
+    output_dir = output_dir or video_dir
+    os.makedirs(output_dir, exist_ok=True)
+    videos = sorted(
+        os.path.join(root, file_name)
+        for root, _, files in os.walk(video_dir)
+        for file_name in files
+        if file_name.lower().endswith(VIDEO_EXTENSIONS)
+    )
+    if not videos:
+        print(f"No videos found in {video_dir}")
+        return
+
+    workers = max(1, min(workers, len(videos)))
+    print(f"Annotating {len(videos)} videos with {workers} workers")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_path, template_path)) as pool:
+        futures = {pool.submit(annotate_video, video, video_dir, output_dir, not no_flip): video for video in videos}
+        for done, future in enumerate(as_completed(futures), 1):
+            video = futures[future]
+            try:
+                log_path, count, elapsed = future.result()
+                print(f"[{done}/{len(videos)}] {os.path.relpath(video, video_dir)}: {count} gestures in {elapsed:.1f}s -> {log_path}")
+            except Exception as e:
+                print(f"[{done}/{len(videos)}] {os.path.relpath(video, video_dir)}: Error: {e}")
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,71 @@
 # application for task 3
+import cv2
+import click
+from pointing_input import HandDetector, MouseMapper, StrokeListener
+from recognizer import DrawingWindow, AsyncRecognizer
+
+
+class WindowStrokeFeed(StrokeListener):
+    """Feeds pinch strokes from a MouseMapper straight into a DrawingWindow without going through the OS pointer."""
+    def __init__(self, window: DrawingWindow, frame_width: int, frame_height: int):
+        self.window = window
+        # Injected OS mouse events must not build a second stroke in screen coordinates
+        window.external_strokes = True
+        self.scale_x = window.width / frame_width
+        self.scale_y = window.height / frame_height
+
+    def _to_window(self, x: float, y: float):
+        # Frame coordinates have their origin top left, pyglet bottom left
+        return x * self.scale_x, self.window.height - y * self.scale_y
+
+    def stroke_begin(self, x: float, y: float):
+        self.window.begin_stroke(*self._to_window(x, y))
+
+    def stroke_move(self, x: float, y: float):
+        if not self.window.stroke_points:
+            return  # The stroke was already finished (e.g. saved) while still pinching
+        point = self._to_window(x, y)
+        if point != self.window.stroke_points[-1]:
+            self.window.add_stroke_point(*point)
+
+    def stroke_end(self, x: float, y: float):
+        self.window.end_stroke()
+
+
+@click.command()
+@click.option("--video-id", "-c", default=0, help="ID of the webcam you want to use", type=int, show_default=True)
+@click.option("--cam-width", "-w", default=640, help="Width of the webcam frame", type=int, show_default=True)
+@click.option("--cam-height", "-h", default=480, help="Height of the webcam frame", type=int, show_default=True)
+@click.option("--inject-mouse", "-m", is_flag=True, help="Also move the OS mouse pointer and press its buttons")
+def main(video_id: int, cam_width: int, cam_height: int, inject_mouse: bool) -> None:
+    print(f"Starting webcam capture with camera ID: {video_id}")
+    cap = cv2.VideoCapture(video_id)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, cam_width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, cam_height)
+
+    if not cap.isOpened():
+        print(f"Error: Could not open camera with ID {video_id}")
+        return
+
+    hand_detector = HandDetector()
+    recognizer = AsyncRecognizer()
+    window = DrawingWindow(recognizer=recognizer, caption="$1 Mid-Air Gestures")
+    mouse = MouseMapper(window.width, window.height, inject_mouse=inject_mouse)
+    mouse.add_stroke_listener(WindowStrokeFeed(window, mouse.frame_width, mouse.frame_height))
+
+    def capture_loop(dt: float) -> None:
+        ret, frame = cap.read()
+        if not ret:
+            return
+        frame = cv2.flip(frame, 1)
+        right, left = hand_detector.detect_landmarks(frame) # ! Left and right are swapped due to the frame flipping
+        mouse.process(left, right, use_right=True)
+        window.update_background(frame)
+
+    window.run(capture_loop)
+    cap.release()
+    cv2.destroyAllWindows()
+
+
+if __name__ == "__main__":
+    main()
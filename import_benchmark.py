@@ -0,0 +1,52 @@
+import statistics
+import subprocess
+import sys
+import click
+
+# Modules that must not be loaded by the headless imports below
+HEAVY_MODULES = ["pyglet", "cv2", "click", "mediapipe", "numba", "pynput", "tkinter"]
+
+TARGETS = {
+    "recognizer": "from recognizer import Recognizer, AsyncRecognizer, GestureSaver",
+    "pointing_input": "from pointing_input import HandData",
+}
+
+SNIPPET = """
+import sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(elapsed)
+print(",".join(name for name in {heavy!r} if name in sys.modules))
+"""
+
+
+def measure(statement: str) -> tuple:
+    """Import in a fresh interpreter and return the elapsed seconds and the heavy modules that got loaded."""
+    output = subprocess.run(
+        [sys.executable, "-c", SNIPPET.format(statement=statement, heavy=HEAVY_MODULES)],
+        capture_output=True, text=True, check=True
+    ).stdout.splitlines()
+    return float(output[0]), [name for name in output[1].split(",") if name]
+
+
+@click.command()
+@click.option("--runs", "-n", default=10, help="Fresh interpreters per target", type=int, show_default=True)
+@click.option("--budget-ms", "-b", default=250.0, help="Maximum median import time per target", type=float, show_default=True)
+def main(runs: int, budget_ms: float):
+    """Measure the cold import time of the headless modules and fail if it regresses."""
+    failed = False
+    for name, statement in TARGETS.items():
+        results = [measure(statement) for _ in range(runs)]
+        median_ms = statistics.median(elapsed for elapsed, _ in results) * 1000
+        loaded = sorted({module for _, modules in results for module in modules})
+        status = "OK"
+        if median_ms > budget_ms or loaded:
+            status = "FAIL"
+            failed = True
+        print(f"{status:<4} {name:<15} median {median_ms:7.1f} ms (budget {budget_ms:.0f} ms)" + (f", loaded {', '.join(loaded)}" if loaded else ""))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import os
+from typing import Callable, List, Optional
+import numpy as np
+
+# Shared by the append-only record files (landmark recordings, gesture packs):
+#   <path>      header followed by back to back records
+#   <path>.idx  one little endian uint64 byte offset per record into <path>
+# record_end(pos) returns the byte offset right after the record starting at pos, or None if it is incomplete.
+RecordEnd = Callable[[int], Optional[int]]
+OFFSET_DTYPE = "<u8"
+OFFSET_SIZE = 8
+
+
+def index_path(path: str) -> str:
+    return path + ".idx"
+
+
+def read_index(path: str) -> np.ndarray:
+    """Offsets stored in the index of path, ignoring a torn trailing entry."""
+    if not os.path.exists(index_path(path)):
+        return np.zeros(0, dtype=OFFSET_DTYPE)
+    with open(index_path(path), "rb") as f:
+        data = f.read()
+    return np.frombuffer(data[:len(data) - len(data) % OFFSET_SIZE], dtype=OFFSET_DTYPE).copy()
+
+
+def scan_offsets(start: int, record_end: RecordEnd) -> np.ndarray:
+    """Walk the records from start up to the first incomplete one."""
+    offsets: List[int] = []
+    pos = start
+    end = record_end(pos)
+    while end is not None:
+        offsets.append(pos)
+        pos = end
+        end = record_end(pos)
+    return np.array(offsets, dtype=OFFSET_DTYPE)
+
+
+def valid_offsets(offsets: np.ndarray, record_end: RecordEnd) -> np.ndarray:
+    """Keep the indexed records that are complete and end where the next indexed record starts.
+    A torn record that later records were appended after fails this check, the records after it are kept."""
+    offsets = offsets.tolist()
+    valid: List[int] = []
+    for i, pos in enumerate(offsets):
+        end = record_end(pos)
+        if end is not None and (i + 1 == len(offsets) or end == offsets[i + 1]):
+            valid.append(pos)
+    return np.array(valid, dtype=OFFSET_DTYPE)
+
+
+def load_offsets(path: str, start: int, record_end: RecordEnd) -> np.ndarray:
+    """Validated offsets from the index, or a scan of the file if the index is missing."""
+    if os.path.exists(index_path(path)):
+        return valid_offsets(read_index(path), record_end)
+    return scan_offsets(start, record_end)
+
+
+def repair(path: str, header_size: int, open_reader: Callable):
+    """Cut a torn trailing record (e.g. crash while writing) and rewrite the index to the intact records,
+    so new records aren't appended after garbage. open_reader(path) must return a context manager with
+    offsets and record_end(pos)."""
+    if not os.path.exists(path):
+        return
+    size = os.path.getsize(path)
+    if size < header_size:
+        open(path, "wb").close()  # Not even the header made it, start over
+        open(index_path(path), "wb").close()
+        return
+    with open_reader(path) as reader:
+        offsets = reader.offsets
+        end = reader.record_end(int(offsets[-1])) if len(offsets) else header_size
+    indexed = read_index(path)
+    # Nothing to do if every indexed record is intact and the last one ends exactly at the end of the file
+    if end == size and np.array_equal(indexed, offsets) and os.path.getsize(index_path(path)) == len(indexed) * OFFSET_SIZE:
+        return
+    if end < size:
+        with open(path, "r+b") as f:
+            f.truncate(end)
+    offsets.tofile(index_path(path))
@@ -0,0 +1,62 @@
+import time
+from typing import Callable
+import click
+import numpy as np
+from recognizer import kernels
+
+
+def random_strokes(count: int, rng: np.random.Generator) -> list:
+    """Random walks with 20-200 points, similar in size to drawn strokes."""
+    return [np.cumsum(rng.normal(0, 10, size=(rng.integers(20, 200), 2)), axis=0) for _ in range(count)]
+
+
+def time_call(fn: Callable[[], object], repeat: int) -> float:
+    fn()  # Warm up (triggers JIT compilation for numba)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def check_parity(strokes: list, templates: np.ndarray, label_ids: np.ndarray, num_labels: int, num_points: int):
+    """Compare the numba kernels against the numpy reference."""
+    resample_numba, label_min_distances_numba = kernels.numba_kernels()
+    for stroke in strokes:
+        np.testing.assert_allclose(resample_numba(stroke, num_points), kernels.resample_numpy(stroke, num_points), rtol=1e-6, atol=1e-6)
+    for candidate in templates[:20] + 1.0:
+        numba_dists, numba_idx = label_min_distances_numba(candidate, templates, label_ids, num_labels)
+        numpy_dists, numpy_idx = kernels.label_min_distances_numpy(candidate, templates, label_ids, num_labels)
+        np.testing.assert_allclose(numba_dists, numpy_dists, rtol=1e-9)
+        np.testing.assert_array_equal(numba_idx, numpy_idx)
+
+
+@click.command()
+@click.option("--templates", "-t", default=1600, help="Number of templates", type=int, show_default=True)
+@click.option("--labels", "-l", default=16, help="Number of labels", type=int, show_default=True)
+@click.option("--num-points", "-n", default=64, type=int, show_default=True)
+@click.option("--repeat", "-r", default=200, type=int, show_default=True)
+def main(templates: int, labels: int, num_points: int, repeat: int):
+    """Check parity of the recognizer kernels and time every available backend."""
+    rng = np.random.default_rng(0)
+    strokes = random_strokes(50, rng)
+    template_stack = np.stack([kernels.resample_numpy(s, num_points) for s in random_strokes(templates, rng)])
+    label_ids = rng.integers(0, labels, size=templates).astype(np.int64)
+
+    backends = {"numpy": (kernels.resample_numpy, kernels.label_min_distances_numpy)}
+    if kernels.NUMBA_AVAILABLE:
+        check_parity(strokes, template_stack, label_ids, labels, num_points)
+        print("Parity: numba matches numpy")
+        backends["numba"] = kernels.numba_kernels()
+    else:
+        print("Numba is not installed, only the numpy backend is available")
+    print(f"Active backend: {kernels.BACKEND}")
+
+    candidate = template_stack[0] + 1.0
+    for name, (resample, label_min_distances) in backends.items():
+        resample_us = time_call(lambda: [resample(s, num_points) for s in strokes], repeat) / len(strokes)
+        match_us = time_call(lambda: label_min_distances(candidate, template_stack, label_ids, labels), repeat)
+        print(f"{name:<6} resample {resample_us:8.1f} us/stroke | match {match_us:8.1f} us ({templates} templates)")
+
+
+if __name__ == "__main__":
+    main()
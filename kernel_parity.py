@@ -0,0 +1,189 @@
+import sys
+from collections import defaultdict
+from typing import Callable, Dict, List, Tuple
+import click
+import numpy as np
+from recognizer import Recognizer, kernels
+
+
+class BaselineRecognizer(Recognizer):
+    """The resampling, rotation and matching of the Recognizer before the kernels were introduced, kept as reference."""
+
+    def _resample(self, points: np.ndarray) -> np.ndarray:
+        points = points.tolist()
+        distances = np.sqrt(np.sum(np.diff(points, axis=0)**2, axis=1))
+        path_length = np.sum(distances)
+        interval = path_length / (self.num_points - 1)
+
+        resampled = [points[0]]
+        accumulated_distance = 0.0
+        i = 1
+        while i < len(points):
+            dist = np.linalg.norm(np.array(points[i]) - np.array(points[i - 1]))
+            if (accumulated_distance + dist) >= interval:
+                t = (interval - accumulated_distance) / dist
+                new_point = [
+                    points[i - 1][0] + t * (points[i][0] - points[i - 1][0]),
+                    points[i - 1][1] + t * (points[i][1] - points[i - 1][1])
+                ]
+                resampled.append(new_point)
+                points.insert(i, new_point)
+                accumulated_distance = 0.0
+                i += 1
+            else:
+                accumulated_distance += dist
+                i += 1
+
+        while len(resampled) < self.num_points:
+            resampled.append(points[-1])
+
+        return np.array(resampled)
+
+    def _rotate(self, points: np.ndarray, angle: float) -> np.ndarray:
+        center = self._centroid(points)
+        new_points = []
+        cos_angle = np.cos(angle)
+        sin_angle = np.sin(angle)
+        for p in points:
+            px, py = p
+            cx, cy = center
+            qx = (px - cx) * cos_angle - (py - cy) * sin_angle + cx
+            qy = (px - cx) * sin_angle + (py - cy) * cos_angle + cy
+            new_points.append([qx, qy])
+        return np.array(new_points)
+
+    def recognize(self, points: np.ndarray):
+        normalized_points, params = self.normalize(points)
+        best_label, best_template, best_score = self.match(normalized_points)
+        denormalized_template = self.denormalize(best_template, params)
+        label_min_dist = defaultdict(lambda: float('inf'))
+        for label, template in self.templates:
+            dist = self._path_distance(normalized_points, template)
+            if dist < label_min_dist[label]:
+                label_min_dist[label] = dist
+        labels = list(label_min_dist.keys())
+        min_dists = np.array([label_min_dist[label] for label in labels])
+        logits = -min_dists
+        exp_logits = np.exp(logits - np.max(logits))
+        probs = exp_logits / np.sum(exp_logits)
+        confidence = dict(zip(labels, probs)).get(best_label, 0.0)
+        return best_label, normalized_points, denormalized_template, confidence
+
+    def match(self, candidate: np.ndarray) -> Tuple[str, np.ndarray, float]:
+        best_score = float("inf")
+        best_template: Tuple[str, np.ndarray] = ("", np.array([]))
+        for label, template in self.templates:
+            dist = self._path_distance(candidate, template)
+            if dist < best_score:
+                best_score = dist
+                best_template = (label, template)
+        return best_template[0], best_template[1], best_score
+
+
+def random_strokes(count: int, rng: np.random.Generator) -> List[np.ndarray]:
+    """Random walks with 20-200 points, similar in size to drawn strokes."""
+    return [np.cumsum(rng.normal(0, 10, size=(rng.integers(20, 200), 2)), axis=0) for _ in range(count)]
+
+
+def build_recognizer(cls, raw_templates: List[Tuple[str, np.ndarray]], num_points: int) -> Recognizer:
+    """A recognizer holding the given templates, normalized by its own implementation."""
+    recognizer = cls.__new__(cls)
+    recognizer.num_points = num_points
+    recognizer.templates = [(label, recognizer.normalize(points)[0]) for label, points in raw_templates]
+    recognizer.loading = False
+    return recognizer
+
+
+def available_backends(require_numba: bool) -> Dict[str, Tuple[Callable, Callable]]:
+    backends = {"numpy": (kernels.resample_numpy, kernels.label_min_distances_numpy)}
+    if not kernels.NUMBA_AVAILABLE:
+        message = "numba is not installed"
+    else:
+        try:
+            backends["numba"] = kernels.numba_kernels()
+            return backends
+        except Exception as e:
+            message = f"numba can't be imported ({type(e).__name__}: {e})"
+    if require_numba:
+        raise click.ClickException(message)
+    print(f"SKIP numba kernels: {message}")
+    return backends
+
+
+def check_kernels(backends, strokes, template_stack, label_ids, num_labels, num_points) -> List[str]:
+    """Compare every backend against the NumPy kernels."""
+    failures = []
+    for name, (resample, label_min_distances) in backends.items():
+        if name == "numpy":
+            continue
+        for i, stroke in enumerate(strokes):
+            if not np.allclose(resample(stroke, num_points), kernels.resample_numpy(stroke, num_points), rtol=1e-6, atol=1e-6):
+                failures.append(f"{name} resample differs from numpy for stroke {i}")
+        for i, candidate in enumerate(template_stack[:20] + 1.0):
+            dists, indices = label_min_distances(candidate, template_stack, label_ids, num_labels)
+            ref_dists, ref_indices = kernels.label_min_distances_numpy(candidate, template_stack, label_ids, num_labels)
+            if not np.allclose(dists, ref_dists, rtol=1e-9) or not np.array_equal(indices, ref_indices):
+                failures.append(f"{name} label_min_distances differs from numpy for candidate {i}")
+    return failures
+
+
+def check_recognizer(backend: str, recognizer: Recognizer, baseline: BaselineRecognizer, strokes: List[np.ndarray]) -> List[str]:
+    """Compare resampling, rotation, matching and recognition of the Recognizer against the baseline."""
+    failures = []
+    for i, stroke in enumerate(strokes):
+        resampled, ref_resampled = recognizer._resample(stroke), baseline._resample(stroke)
+        if resampled.shape != ref_resampled.shape or not np.allclose(resampled, ref_resampled, rtol=1e-6, atol=1e-6):
+            failures.append(f"{backend} _resample differs from the baseline for stroke {i}")
+            continue
+        angle = float(i) / len(strokes) * 2 * np.pi
+        if not np.allclose(recognizer._rotate(ref_resampled, angle), baseline._rotate(ref_resampled, angle), rtol=1e-9, atol=1e-9):
+            failures.append(f"{backend} _rotate differs from the baseline for stroke {i}")
+        candidate, _ = baseline.normalize(stroke)
+        label, _, score = recognizer.match(candidate)
+        ref_label, _, ref_score = baseline.match(candidate)
+        if label != ref_label or not np.isclose(score, ref_score, rtol=1e-9):
+            failures.append(f"{backend} match differs from the baseline for stroke {i}: {label} {score} != {ref_label} {ref_score}")
+        label, _, _, confidence = recognizer.recognize(stroke)
+        ref_label, _, _, ref_confidence = baseline.recognize(stroke)
+        if label != ref_label or not np.isclose(confidence, ref_confidence, rtol=1e-6, atol=1e-9):
+            failures.append(f"{backend} recognize differs from the baseline for stroke {i}: {label} {confidence} != {ref_label} {ref_confidence}")
+    return failures
+
+
+@click.command()
+@click.option("--templates", "-t", default=200, help="Number of synthetic templates", type=int, show_default=True)
+@click.option("--labels", "-l", default=16, help="Number of labels", type=int, show_default=True)
+@click.option("--strokes", "-s", default=100, help="Number of candidate strokes", type=int, show_default=True)
+@click.option("--num-points", "-n", default=64, type=int, show_default=True)
+@click.option("--require-numba", is_flag=True, help="Fail instead of skipping the numba kernels if numba can't be imported")
+def main(templates: int, labels: int, strokes: int, num_points: int, require_numba: bool):
+    """Check the recognizer kernels against each other and the Recognizer against its original implementation.
+
+    Exits with status 1 on any mismatch.
+    """
+    rng = np.random.default_rng(0)
+    candidates = random_strokes(strokes, rng)
+    raw_templates = [(f"label{i % labels}", stroke) for i, stroke in enumerate(random_strokes(templates, rng))]
+    template_stack = np.stack([kernels.resample_numpy(stroke, num_points) for _, stroke in raw_templates])
+    label_ids = np.array([i % labels for i in range(templates)], dtype=np.int64)
+
+    backends = available_backends(require_numba)
+    failures = check_kernels(backends, candidates, template_stack, label_ids, labels, num_points)
+    baseline = build_recognizer(BaselineRecognizer, raw_templates, num_points)
+    active = (kernels.resample, kernels.label_min_distances)
+    try:
+        for name, (resample, label_min_distances) in backends.items():
+            # The Recognizer looks the kernels up on every call, so swapping them checks it with each backend
+            kernels.resample, kernels.label_min_distances = resample, label_min_distances
+            failures += check_recognizer(name, build_recognizer(Recognizer, raw_templates, num_points), baseline, candidates)
+    finally:
+        kernels.resample, kernels.label_min_distances = active
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"{'FAIL' if failures else 'OK':<4} {len(failures)} mismatches, backends checked: {', '.join(backends)}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
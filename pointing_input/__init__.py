@@ -1,2 +1,17 @@
-from .hand_detector import HandDetector, HandData
-from .mouse_mapper import MouseMapper
\ No newline at end of file
+from .hand_detector import HandData
+
+# Detection and mouse control pull in mediapipe, OpenCV, pynput and tkinter, so they are only imported on first access
+_LAZY = {
+    "HandDetector": ".hand_detector",
+    "MouseMapper": ".mouse_mapper",
+    "StrokeListener": ".mouse_mapper",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
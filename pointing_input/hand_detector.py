@@ -1,19 +1,43 @@
-import mediapipe as mp
-from mediapipe.tasks import python
-from mediapipe.tasks.python import vision
-from typing import List, Tuple, Optional
+from typing import Tuple, Optional
 import numpy as np
-import cv2
+
+# Hardcoded based on https://ai.google.dev/edge/mediapipe/solutions/vision/gesture_recognizer#hand_landmark_model_bundle
+NUM_LANDMARKS = 21
+WRIST = 0
+THUMB_CMC = 1
+THUMB_TIP = 4
+INDEX_FINGER_MCP = 5
+INDEX_FINGER_TIP = 8
+MIDDLE_FINGER_MCP = 9
+MIDDLE_FINGER_TIP = 12
+RING_FINGER_MCP = 13
+PINKY_MCP = 17
 
 class HandData:
-    def __init__(self, landmarks: List[Tuple[float, float, float]], gesture: str):
+    """Landmarks of a single detected hand stored as a (21, 3) float32 array of normalized (x, y, z) coordinates."""
+    __slots__ = ("landmarks", "gesture")
+
+    def __init__(self, landmarks: np.ndarray, gesture: str):
         self.landmarks = landmarks
         self.gesture = gesture
 
+    @classmethod
+    def from_mediapipe(cls, hand_landmarks, gesture: str) -> "HandData":
+        """Fill the landmark array directly from a mediapipe landmark list without intermediate tuples."""
+        landmarks = np.empty((NUM_LANDMARKS, 3), dtype=np.float32)
+        for i, lm in enumerate(hand_landmarks):
+            landmarks[i, 0] = lm.x
+            landmarks[i, 1] = lm.y
+            landmarks[i, 2] = lm.z
+        return cls(landmarks, gesture)
+
 # ! TODO: Keep gesturerecognizer for now but seems like basic landmark distance comparisons are more than enough for these tasks, 
 # ! replacing gesture recognizer with simple hand landmark detection would improve speed and reduce complexity
 class HandDetector:
     def __init__(self, model_path: str = "pointing_input/gesture_recognizer.task"):
+        # Imported here so HandData can be used without loading mediapipe
+        from mediapipe.tasks import python
+        from mediapipe.tasks.python import vision
         base_options = python.BaseOptions(model_asset_buffer=open(model_path, "rb").read())
         options = vision.GestureRecognizerOptions(
             base_options=base_options,
@@ -22,6 +46,8 @@ class HandDetector:
         self.recognizer = vision.GestureRecognizer.create_from_options(options)
 
     def detect_landmarks(self, image_frame: np.ndarray) -> Tuple[Optional[HandData], Optional[HandData]]:
+        import mediapipe as mp
+        import cv2
         rgb_image = cv2.cvtColor(image_frame, cv2.COLOR_BGR2RGB)
         mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_image)
         result = self.recognizer.recognize(mp_image)
@@ -33,9 +59,8 @@ class HandDetector:
             for i in range(len(result.gestures)):
                 handedness_label = result.handedness[i][0].category_name  # "Left" or "Right"
                 gesture_label = result.gestures[i][0].category_name
-                landmarks = [(lm.x, lm.y, lm.z) for lm in result.hand_landmarks[i]]
 
-                hand_data = HandData(landmarks, gesture_label)
+                hand_data = HandData.from_mediapipe(result.hand_landmarks[i], gesture_label)
                 if handedness_label == "Left":
                     left_hand = hand_data
                 elif handedness_label == "Right":
@@ -0,0 +1,80 @@
+import time
+from typing import List, Optional
+
+
+class IdleScheduler:
+    """Throttles capture and hand detection when no hand has been seen for a while.
+
+    After `idle_after` consecutive frames without a hand only every `probe_every`-th frame is decoded and run
+    through detection at `probe_scale` resolution. The first probe that finds a hand switches back to full rate.
+    """
+    def __init__(self, idle_after: int = 60, probe_every: int = 6, probe_scale: float = 0.5):
+        self.idle_after = idle_after
+        self.probe_every = max(1, probe_every)
+        self.probe_scale = probe_scale
+        self.frames_without_hand = 0
+        self.idle = False
+        self._frame = 0
+        self._last_probe: Optional[float] = None
+
+        # Stats
+        self.frames_total = 0
+        self.frames_skipped = 0
+        self.probes = 0
+        self.active_detect_time = 0.0
+        self.active_detect_count = 0
+        self.probe_detect_time = 0.0
+        self.wake_latencies: List[float] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self.idle_after > 0
+
+    def should_detect(self) -> bool:
+        """Whether the current frame should be decoded and run through detection. Call once per tick."""
+        self.frames_total += 1
+        self._frame += 1
+        if not self.idle or self._frame % self.probe_every == 0:
+            return True
+        self.frames_skipped += 1
+        return False
+
+    @property
+    def scale(self) -> float:
+        """Resolution scale to run detection at for the current frame."""
+        return self.probe_scale if self.idle else 1.0
+
+    def update(self, hand_present: bool, detect_time: float):
+        """Report the result of a detection pass and how long it took (seconds)."""
+        now = time.perf_counter()
+        if self.idle:
+            self.probes += 1
+            self.probe_detect_time += detect_time
+        else:
+            self.active_detect_time += detect_time
+            self.active_detect_count += 1
+
+        if hand_present:
+            if self.idle:
+                # The hand may have entered right after the previous probe, so this is an upper bound
+                self.wake_latencies.append(now - (self._last_probe or now))
+                self.idle = False
+            self.frames_without_hand = 0
+        else:
+            self.frames_without_hand += 1
+            if self.enabled and not self.idle and self.frames_without_hand >= self.idle_after:
+                self.idle = True
+                self._frame = 0
+        self._last_probe = now
+
+    def cpu_time_saved(self) -> float:
+        """Estimated detection time saved in seconds compared to running full rate, full resolution detection."""
+        if not self.active_detect_count:
+            return 0.0
+        avg_active = self.active_detect_time / self.active_detect_count
+        return self.frames_skipped * avg_active + max(0.0, self.probes * avg_active - self.probe_detect_time)
+
+    def summary(self) -> str:
+        wake = f"{max(self.wake_latencies) * 1000:.1f} ms max over {len(self.wake_latencies)} wake-ups" if self.wake_latencies else "no wake-ups"
+        return (f"Idle: {self.frames_skipped}/{self.frames_total} frames skipped, {self.probes} probes, "
+                f"~{self.cpu_time_saved():.2f}s detection time saved, wake-up latency {wake}")
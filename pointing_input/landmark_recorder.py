@@ -0,0 +1,203 @@
+import os
+import struct
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+import numpy as np
+import cv2
+import indexed_records
+from pointing_input.hand_detector import HandData, NUM_LANDMARKS
+
+# File layout:
+#   <path>      "LMRK" magic, version, frame width/height, followed by append-only records
+#   <path>.idx  one little endian uint64 byte offset per record into <path>
+# Record layout:
+#   timestamp (float64), flags (uint8), frame byte length (uint32)
+#   per present hand: gesture length (uint8), gesture (utf-8), landmarks (21 * 3 float32)
+#   encoded frame bytes (jpg) if a frame was recorded
+MAGIC = b"LMRK"
+VERSION = 1
+HEADER = struct.Struct("<4sHHH")
+RECORD_HEADER = struct.Struct("<dBI")
+OFFSET = struct.Struct("<Q")
+LANDMARK_BYTES = NUM_LANDMARKS * 3 * 4
+
+FLAG_LEFT = 1
+FLAG_RIGHT = 2
+
+
+class LandmarkRecord:
+    """A single recorded frame of hand detector output."""
+    __slots__ = ("timestamp", "left", "right", "frame")
+
+    def __init__(self, timestamp: float, left: Optional[HandData], right: Optional[HandData], frame: Optional[np.ndarray]):
+        self.timestamp = timestamp
+        self.left = left
+        self.right = right
+        self.frame = frame
+
+
+class LandmarkRecorder:
+    """Append timestamped HandData streams (and optionally the camera frames) to a compact binary file."""
+    def __init__(self, path: str, frame_width: int = 0, frame_height: int = 0, jpeg_quality: int = 90):
+        self.path = path
+        self.jpeg_quality = jpeg_quality
+        indexed_records.repair(path, HEADER.size, LandmarkReader)
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._data: BinaryIO = open(path, "ab")
+        self._index: BinaryIO = open(path + ".idx", "ab")
+        if is_new:
+            self._data.write(HEADER.pack(MAGIC, VERSION, frame_width, frame_height))
+        self.count = 0
+
+    def write(self, timestamp: float, left: Optional[HandData], right: Optional[HandData], frame: Optional[np.ndarray] = None):
+        """Append a record and its offset to the index."""
+        flags = (FLAG_LEFT if left else 0) | (FLAG_RIGHT if right else 0)
+        frame_bytes = b""
+        if frame is not None:
+            ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            if ok:
+                frame_bytes = encoded.tobytes()
+
+        chunks = [RECORD_HEADER.pack(timestamp, flags, len(frame_bytes))]
+        for hand in (left, right):
+            if hand:
+                gesture = (hand.gesture or "").encode("utf-8")[:255]
+                chunks.append(bytes((len(gesture),)))
+                chunks.append(gesture)
+                chunks.append(np.ascontiguousarray(hand.landmarks, dtype="<f4").tobytes())
+        chunks.append(frame_bytes)
+
+        self._index.write(OFFSET.pack(self._data.tell()))
+        self._data.write(b"".join(chunks))
+        self.count += 1
+
+    def close(self):
+        self._data.close()
+        self._index.close()
+
+    def __enter__(self) -> "LandmarkRecorder":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+class LandmarkReader:
+    """Random access reader for files written by LandmarkRecorder."""
+    def __init__(self, path: str):
+        self.path = path
+        self._file: BinaryIO = open(path, "rb")
+        self._size = os.path.getsize(path)
+        if self._size < HEADER.size:
+            self._file.close()
+            raise ValueError(f"'{path}' is not a landmark recording.")
+        magic, version, self.frame_width, self.frame_height = HEADER.unpack(self._file.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"'{path}' is not a landmark recording.")
+        if version != VERSION:
+            raise ValueError(f"Unsupported landmark recording version {version}.")
+        self.offsets = indexed_records.load_offsets(path, HEADER.size, self.record_end)
+
+    def record_end(self, pos: int) -> Optional[int]:
+        """Byte offset right after the record starting at pos, or None if the record is incomplete."""
+        size = self._size
+        if pos < HEADER.size or pos + RECORD_HEADER.size > size:
+            return None
+        self._file.seek(pos)
+        _, flags, frame_len = RECORD_HEADER.unpack(self._file.read(RECORD_HEADER.size))
+        end = pos + RECORD_HEADER.size
+        for flag in (FLAG_LEFT, FLAG_RIGHT):
+            if flags & flag:
+                if end + 1 > size:
+                    return None
+                self._file.seek(end)
+                end += 1 + self._file.read(1)[0] + LANDMARK_BYTES
+        end += frame_len
+        return end if end <= size else None
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, i: int) -> LandmarkRecord:
+        self._file.seek(int(self.offsets[i]))
+        return self._read_record(self._file)
+
+    def __iter__(self) -> Iterator[LandmarkRecord]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def _read_record(self, f: BinaryIO) -> LandmarkRecord:
+        timestamp, flags, frame_len = RECORD_HEADER.unpack(f.read(RECORD_HEADER.size))
+        hands: List[Optional[HandData]] = []
+        for flag in (FLAG_LEFT, FLAG_RIGHT):
+            if flags & flag:
+                gesture = f.read(f.read(1)[0]).decode("utf-8")
+                landmarks = np.frombuffer(f.read(LANDMARK_BYTES), dtype="<f4").reshape(NUM_LANDMARKS, 3)
+                hands.append(HandData(landmarks, gesture))
+            else:
+                hands.append(None)
+        frame = None
+        if frame_len:
+            frame = cv2.imdecode(np.frombuffer(f.read(frame_len), dtype=np.uint8), cv2.IMREAD_COLOR)
+        return LandmarkRecord(timestamp, hands[0], hands[1], frame)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self) -> "LandmarkReader":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+class ReplayCapture:
+    """Stand-in for cv2.VideoCapture that plays back a landmark recording."""
+    def __init__(self, reader: LandmarkReader, loop: bool = False):
+        self.reader = reader
+        self.loop = loop
+        self.position = -1
+        self.current: Optional[LandmarkRecord] = None
+        self._blank = np.zeros((max(reader.frame_height, 1), max(reader.frame_width, 1), 3), dtype=np.uint8)
+
+    def isOpened(self) -> bool:
+        return len(self.reader) > 0
+
+    def set(self, prop_id: int, value: float) -> bool:
+        return False
+
+    def get(self, prop_id: int) -> float:
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.reader.frame_width)
+        if prop_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.reader.frame_height)
+        if prop_id == cv2.CAP_PROP_FRAME_COUNT:
+            return float(len(self.reader))
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.position + 1)
+        return 0.0
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        self.position += 1
+        if self.position >= len(self.reader):
+            if not self.loop or len(self.reader) == 0:
+                self.current = None
+                return False, None
+            self.position = 0
+        self.current = self.reader[self.position]
+        frame = self.current.frame if self.current.frame is not None else self._blank
+        return True, frame
+
+    def release(self):
+        self.reader.close()
+
+
+class ReplayHandDetector:
+    """Stand-in for HandDetector that returns the hands recorded for the frame last read from a ReplayCapture."""
+    def __init__(self, capture: ReplayCapture):
+        self.capture = capture
+
+    def detect_landmarks(self, image_frame: np.ndarray) -> Tuple[Optional[HandData], Optional[HandData]]:
+        record = self.capture.current
+        if record is None:
+            return None, None
+        return record.left, record.right
@@ -0,0 +1,141 @@
+import csv
+import json
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+import numpy as np
+import cv2
+
+# Pipeline stages in the order they happen within a frame ("record" is only marked while recording)
+STAGES = ["read", "flip", "detect", "record", "process", "mouse_write", "redraw"]
+# The pointer write happens inside MouseMapper.process, so it is a sub-mark of "process" rather than a stage of its own
+SUB_STAGES = {"mouse_write": "process"}
+
+
+class FrameTrace:
+    """perf_counter timestamps of every pipeline stage a single camera frame went through."""
+    __slots__ = ("frame", "start", "marks")
+
+    def __init__(self, frame: int, start: float):
+        self.frame = frame
+        self.start = start
+        self.marks: Dict[str, float] = {}
+
+    def durations(self) -> Dict[str, float]:
+        """Milliseconds spent in each stage since the previous recorded stage, plus the total.
+
+        Sub-marks are measured from the start of their parent stage (e.g. "mouse_write" is the time from the start of
+        MouseMapper.process until the pointer was written) and don't shift the following stages.
+        """
+        result = {}
+        starts = {}
+        prev = self.start
+        for stage in STAGES:
+            if stage not in self.marks or stage in SUB_STAGES:
+                continue
+            starts[stage] = prev
+            result[stage] = (self.marks[stage] - prev) * 1000
+            prev = self.marks[stage]
+        for stage, parent in SUB_STAGES.items():
+            if stage in self.marks and parent in starts:
+                result[stage] = (self.marks[stage] - starts[parent]) * 1000
+        result["total"] = (prev - self.start) * 1000
+        return result
+
+
+class LatencyTracker:
+    """Collects per-frame traces from camera read to redraw and keeps rolling windows for histograms."""
+    def __init__(self, window: int = 240, max_pending: float = 0.5):
+        self.window = window
+        self.max_pending = max_pending
+        self.frame_count = 0
+        self.current: Optional[FrameTrace] = None
+        self.pending: Deque[FrameTrace] = deque()
+        self.traces: List[FrameTrace] = []
+        self.rolling: Dict[str, Deque[float]] = {stage: deque(maxlen=window) for stage in STAGES + ["total"]}
+
+    def begin(self):
+        self.current = FrameTrace(self.frame_count, time.perf_counter())
+        self.frame_count += 1
+
+    def mark(self, stage: str, timestamp: Optional[float] = None):
+        if self.current:
+            self.current.marks[stage] = time.perf_counter() if timestamp is None else timestamp
+
+    def end(self):
+        """Close the current frame. Frames that moved the pointer wait for the redraw that shows the point."""
+        trace, self.current = self.current, None
+        if not trace:
+            return
+        if "mouse_write" in trace.marks:
+            self.pending.append(trace)
+        else:
+            self._finish(trace)
+
+    def on_redraw(self, last_point_time: Optional[float]):
+        """Called after a window redraw with the perf_counter time the newest stroke point was received."""
+        now = time.perf_counter()
+        while self.pending:
+            trace = self.pending[0]
+            if last_point_time is not None and last_point_time >= trace.marks["mouse_write"]:
+                trace.marks["redraw"] = now
+            elif now - trace.start < self.max_pending:
+                break
+            # Either shown now or the point never reached the window (e.g. pointer outside of it)
+            self._finish(self.pending.popleft())
+
+    def _finish(self, trace: FrameTrace):
+        self.traces.append(trace)
+        for stage, ms in trace.durations().items():
+            self.rolling[stage].append(ms)
+
+    def percentiles(self, stage: str, q=(50, 95)) -> Optional[np.ndarray]:
+        values = self.rolling[stage]
+        if not values:
+            return None
+        return np.percentile(np.fromiter(values, dtype=float), q)
+
+    def histogram(self, stage: str = "total", bins: int = 20, max_ms: float = 100.0) -> np.ndarray:
+        counts, _ = np.histogram(np.fromiter(self.rolling[stage], dtype=float), bins=bins, range=(0, max_ms))
+        return counts
+
+    def draw_overlay(self, frame: np.ndarray, x: int = 10, y: int = 20):
+        """Draw rolling p50/p95 per stage and a histogram of the total latency onto a BGR frame."""
+        color = (0, 255, 255)
+        for stage in STAGES + ["total"]:
+            p = self.percentiles(stage)
+            if p is None:
+                continue
+            cv2.putText(frame, f"{stage:<11} p50 {p[0]:6.2f} p95 {p[1]:6.2f} ms", (x, y), cv2.FONT_HERSHEY_PLAIN, 1, color, 1)
+            y += 16
+        counts = self.histogram()
+        if counts.sum() == 0:
+            return
+        bar_width, height = 6, 40
+        heights = (counts / counts.max() * height).astype(int)
+        for i, h in enumerate(heights):
+            x0 = x + i * bar_width
+            cv2.rectangle(frame, (x0, y + height - h), (x0 + bar_width - 1, y + height), color, -1)
+        cv2.putText(frame, "0-100 ms", (x + len(heights) * bar_width + 6, y + height), cv2.FONT_HERSHEY_PLAIN, 1, color, 1)
+
+    def export(self, path: str):
+        """Write all finished traces as CSV or JSON (chosen by file extension)."""
+        rows = []
+        for trace in self.traces:
+            row = {"frame": trace.frame}
+            row.update({f"t_{stage}": round((trace.marks[stage] - trace.start) * 1000, 4) for stage in STAGES if stage in trace.marks})
+            row["total"] = round(trace.durations()["total"], 4)
+            rows.append(row)
+        if path.lower().endswith(".json"):
+            summary = {}
+            for stage in STAGES + ["total"]:
+                p = self.percentiles(stage, (50, 95, 99))
+                if p is not None:
+                    summary[stage] = dict(zip(["p50", "p95", "p99"], p.round(4).tolist()))
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"summary": summary, "frames": rows}, f, indent=2)
+        else:
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=["frame"] + [f"t_{stage}" for stage in STAGES] + ["total"])
+                writer.writeheader()
+                writer.writerows(rows)
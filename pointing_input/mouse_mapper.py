@@ -1,8 +1,20 @@
+import time
 from collections import deque
-from typing import Optional, Deque, Tuple
-from pynput.mouse import Controller, Button
-import tkinter as tk
-from pointing_input.hand_detector import HandData
+from typing import TYPE_CHECKING, List, Optional, Deque, Tuple
+import numpy as np
+from pointing_input.hand_detector import (
+    HandData, NUM_LANDMARKS, WRIST, THUMB_CMC, THUMB_TIP, INDEX_FINGER_MCP, INDEX_FINGER_TIP,
+    MIDDLE_FINGER_MCP, MIDDLE_FINGER_TIP, RING_FINGER_MCP, PINKY_MCP
+)
+
+# Wrist and finger base landmarks used as a stable anchor for pointer movement
+CENTROID_INDICES = np.array([WRIST, THUMB_CMC, INDEX_FINGER_MCP, MIDDLE_FINGER_MCP, RING_FINGER_MCP, PINKY_MCP])
+# Fingertips that are compared against the thumb tip, in the order (index, middle)
+PINCH_TIP_INDICES = np.array([INDEX_FINGER_TIP, MIDDLE_FINGER_TIP])
+TOUCH_THRESHOLD = 0.043
+
+if TYPE_CHECKING:
+    from pynput.mouse import Controller
 
 class ThumbTouchState():
     """TypedDict to represent the state of thumb touch detection."""
@@ -10,22 +22,56 @@ class ThumbTouchState():
         self.index = index
         self.middle = middle
 
+class StrokeListener:
+    """Receives pinch delimited strokes from a MouseMapper in frame coordinates (origin top left)."""
+    def stroke_begin(self, x: float, y: float):
+        pass
+
+    def stroke_move(self, x: float, y: float):
+        pass
+
+    def stroke_end(self, x: float, y: float):
+        pass
+
 class MouseMapper:
-    def __init__(self, frame_width: int, frame_height: int):
-        self.mouse = Controller()
+    def __init__(self, frame_width: int, frame_height: int, controller: Optional["Controller"] = None, screen_size: Optional[Tuple[int, int]] = None, inject_mouse: bool = True):
+        # OS mouse injection is optional, strokes can be consumed directly through stroke listeners instead
+        # pynput is only imported when it is actually used since it needs a display
+        self.mouse = None
+        self.left_button = "left"
+        if inject_mouse:
+            if controller is None:
+                from pynput.mouse import Button, Controller
+                controller = Controller()
+                self.left_button = Button.left
+            else:
+                try:
+                    from pynput.mouse import Button
+                    self.left_button = Button.left
+                except ImportError:
+                    pass  # Stand-in controller without pynput or a display, it receives "left"
+            self.mouse = controller
         self.frame_width = frame_width
         self.frame_height = frame_height
         self.center_x = frame_width // 2
         self.center_y = frame_height // 2
-        self.screen_width, self.screen_height = self._get_screen_size()
+        if screen_size:
+            self.screen_width, self.screen_height = screen_size
+        else:
+            self.screen_width, self.screen_height = self._get_screen_size() if inject_mouse else (frame_width, frame_height)
         self.calibrated = False
         self.position_history: Deque[Tuple[int, int]] = deque(maxlen=5)  # For smoothing
         self.last_set_position: Optional[Tuple[int, int]] = None
         self.touch_state_window: Deque[ThumbTouchState] = deque([ThumbTouchState() for _ in range(5)], maxlen=5)  # Sliding window for smoothing
         self.touch_start: Optional[float] = None
+        self.last_position_write: Optional[float] = None  # perf_counter time of the last pointer update
+        self.stroke_listeners: List[StrokeListener] = []
+        self.stroke_history: Deque[Tuple[float, float]] = deque(maxlen=5)  # For smoothing stroke points
+        self.stroke_point: Optional[Tuple[float, float]] = None  # Last emitted stroke point while pinching
 
     def _get_screen_size(self):
         try:
+            import tkinter as tk
             root = tk.Tk()
             width = root.winfo_screenwidth()
             height = root.winfo_screenheight()
@@ -37,35 +83,24 @@ class MouseMapper:
 
     def calibrate_center(self, hand: HandData):
         """Set the current index finger position as the new center and lock the current mouse position as anchor."""
-        if not hand or len(hand.landmarks) < 8:
+        if not hand:
             return
         self.center_x, self.center_y = self.get_centroid(hand)
-        self.mouse_anchor = self.mouse.position
+        self.mouse_anchor = self.mouse.position if self.mouse else (0, 0)
         self.calibrated = True
     
-    # Hardcoded based on https://ai.google.dev/edge/mediapipe/solutions/vision/gesture_recognizer#hand_landmark_model_bundle
     def get_centroid(self, hand: HandData) -> Tuple[int, int]:
         """Calculate the centroid of the wrist and finger base."""
-        if not hand or not hasattr(hand, "landmarks") or not hand.landmarks:
+        if not hand or hand.landmarks is None or len(hand.landmarks) < NUM_LANDMARKS:
             return self.center_x, self.center_y
 
-        indices = [0, 1, 5, 9, 13, 17]
-        selected_landmarks = [
-            hand.landmarks[i] for i in indices if i < len(hand.landmarks)
-        ]
-        if not selected_landmarks:
-            return self.center_x, self.center_y
-
-        xs = [lm[0] for lm in selected_landmarks]
-        ys = [lm[1] for lm in selected_landmarks]
-        centroid_x = int(sum(xs) / len(xs) * self.frame_width)
-        centroid_y = int(sum(ys) / len(ys) * self.frame_height)
-        return centroid_x, centroid_y
+        centroid = hand.landmarks[CENTROID_INDICES, :2].mean(axis=0)
+        return int(centroid[0] * self.frame_width), int(centroid[1] * self.frame_height)
 
     def move_mouse(self, hand: HandData):
         """Move the mouse pointer to follow the index finger relative to the calibration center and mouse anchor."""
-        if not hand or len(hand.landmarks) < 8 or not hasattr(self, 'mouse_anchor'):
-            return  # Not enough landmarks or not calibrated yet
+        if not self.mouse or not hand or not hasattr(self, 'mouse_anchor'):
+            return  # Mouse injection disabled, not enough landmarks or not calibrated yet
 
         x, y = self.get_centroid(hand)
         
@@ -88,6 +123,19 @@ class MouseMapper:
         
         self.mouse.position = (avg_x, avg_y)
         self.last_set_position = (avg_x, avg_y)
+        self.last_position_write = time.perf_counter()
+
+    def add_stroke_listener(self, listener: StrokeListener):
+        self.stroke_listeners.append(listener)
+
+    def _smoothed_stroke_point(self, hand: Optional[HandData]) -> Optional[Tuple[float, float]]:
+        """Average the recent centroids in frame coordinates, reusing the last point if the hand dropped out."""
+        if hand:
+            self.stroke_history.append(self.get_centroid(hand))
+        if not self.stroke_history:
+            return None
+        x, y = np.mean(self.stroke_history, axis=0)
+        return float(x), float(y)
 
     def get_smoothed_touch_state(self) -> ThumbTouchState:
         # Compute the dominant (majority) state for each finger in the window
@@ -99,18 +147,17 @@ class MouseMapper:
         )
         return smoothed
 
-    def process(self, left_hand: Optional[HandData], right_hand: Optional[HandData], use_right=True):
-        import time
+    def process(self, left_hand: Optional[HandData], right_hand: Optional[HandData], use_right=True, now: Optional[float] = None):
+        """Update touch state and pointer from the latest hands. `now` overrides the wall clock (e.g. for replays)."""
         hand = right_hand if use_right else left_hand
                 
         # Index finger is mapped to clicking and holding, Middle finger is mapped to dragging
-        index_touching = self.index_thumb_touching(hand) if hand else False
-        middle_touching = self.middle_thumb_touching(hand) if hand else False 
+        index_touching, middle_touching = self.thumb_touching(hand)
         # Update sliding window using deque
         prev_state = self.get_smoothed_touch_state()    
         self.touch_state_window.append(ThumbTouchState(index=index_touching, middle=middle_touching))
         current_state = self.get_smoothed_touch_state()
-        now = time.time()
+        now = time.time() if now is None else now
         
         # Movement logic with grace period
         if current_state.index or current_state.middle:
@@ -120,6 +167,10 @@ class MouseMapper:
                 if not self.calibrated:
                     self.calibrate_center(hand)
                 self.move_mouse(hand)
+                if self.stroke_point and current_state.index and hand:
+                    self.stroke_point = self._smoothed_stroke_point(hand)
+                    for listener in self.stroke_listeners:
+                        listener.stroke_move(*self.stroke_point)
         else:
             self.touch_start = None
             self.calibrated = False  # Reset calibration if middle finger is not touching
@@ -128,31 +179,40 @@ class MouseMapper:
         # Transition: not touching -> touching
         touch_started = current_state.index and not prev_state.index
         if touch_started:
-            self.mouse.press(Button.left)
+            if self.mouse:
+                self.mouse.press(self.left_button)
+            self.stroke_history.clear()
+            self.stroke_point = self._smoothed_stroke_point(hand)
+            if self.stroke_point:
+                for listener in self.stroke_listeners:
+                    listener.stroke_begin(*self.stroke_point)
 
         # Transition: touching -> not touching
         touch_ended = not current_state.index and prev_state.index
         if touch_ended:
-            self.mouse.release(Button.left)
+            if self.mouse:
+                self.mouse.release(self.left_button)
+            if self.stroke_point:
+                for listener in self.stroke_listeners:
+                    listener.stroke_end(*self.stroke_point)
+                self.stroke_point = None
+
+    def pinch_distances(self, hand: HandData) -> np.ndarray:
+        """Compute the 2D distances of the index and middle finger tips to the thumb tip in one pass."""
+        landmarks = hand.landmarks
+        return np.linalg.norm(landmarks[PINCH_TIP_INDICES, :2] - landmarks[THUMB_TIP, :2], axis=1)
+
+    def thumb_touching(self, hand: Optional[HandData]) -> Tuple[bool, bool]:
+        """Check whether the index and middle finger tips are touching the thumb tip."""
+        if not hand or hand.landmarks is None or len(hand.landmarks) < NUM_LANDMARKS:
+            return False, False
+        index_touching, middle_touching = self.pinch_distances(hand) < TOUCH_THRESHOLD
+        return bool(index_touching), bool(middle_touching)
 
     def index_thumb_touching(self, hand: HandData) -> bool:
         """Check if the index finger is touching the thumb."""
-        if not hand or len(hand.landmarks) < 9:
-            return False
-        index_tip = hand.landmarks[8]
-        thumb_tip = hand.landmarks[4]
-        dx = index_tip[0] - thumb_tip[0]
-        dy = index_tip[1] - thumb_tip[1]
-        distance = (dx ** 2 + dy ** 2) ** 0.5
-        return distance < 0.043
+        return self.thumb_touching(hand)[0]
     
     def middle_thumb_touching(self, hand: HandData) -> bool:
         """Check if the middle finger tip is touching the thumb tip."""
-        if not hand or len(hand.landmarks) < 13:
-            return False
-        middle_tip = hand.landmarks[12]
-        thumb_tip = hand.landmarks[4]
-        dx = middle_tip[0] - thumb_tip[0]
-        dy = middle_tip[1] - thumb_tip[1]
-        distance = (dx ** 2 + dy ** 2) ** 0.5
-        return distance < 0.043
+        return self.thumb_touching(hand)[1]
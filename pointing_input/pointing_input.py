@@ -1,19 +1,24 @@
+import time
 import cv2
 import click
 from pointing_input import HandDetector, MouseMapper
+from pointing_input.landmark_recorder import LandmarkRecorder
+from pointing_input.latency import LatencyTracker
+from pointing_input.idle_scheduler import IdleScheduler
 from recognizer import DrawingWindow, AsyncRecognizer
 
-hand_detector = HandDetector()
-recognizer = AsyncRecognizer()
-window = DrawingWindow(recognizer=recognizer)
-mouse = MouseMapper(window.width, window.height)
-
 @click.command()
 @click.option("--video-id", "-c", default=0, help="ID of the webcam you want to use", type=int, show_default=True)
 @click.option("--cam-width", "-w", default=640, help="Width of the webcam frame", type=int, show_default=True)
 @click.option("--cam-height", "-h", default=480, help="Height of the webcam frame", type=int, show_default=True)
 @click.option("--debug", "-d", is_flag=True, help="Enable debug mode")
-def main(video_id: int, cam_width: int, cam_height: int, debug: bool) -> None:
+@click.option("--record", "-r", default=None, help="Append the detected landmark stream to this file for replay", type=click.Path(dir_okay=False))
+@click.option("--record-frames", is_flag=True, help="Also store the camera frames in the recording")
+@click.option("--latency-log", "-l", default=None, help="Export per-frame latency traces on exit (.csv or .json)", type=click.Path(dir_okay=False))
+@click.option("--idle-after", default=60, help="Frames without a hand before switching to low-rate probing (0 disables)", type=int, show_default=True)
+@click.option("--probe-every", default=6, help="Run detection on every k-th frame while idle", type=int, show_default=True)
+@click.option("--probe-scale", default=0.5, help="Resolution scale for detection while idle", type=float, show_default=True)
+def main(video_id: int, cam_width: int, cam_height: int, debug: bool, record: str, record_frames: bool, latency_log: str, idle_after: int, probe_every: int, probe_scale: float) -> None:
     print(f"Starting webcam capture with camera ID: {video_id}")
     cap = cv2.VideoCapture(video_id)
     cap.set(cv2.CAP_PROP_FRAME_WIDTH, cam_width)
@@ -23,23 +28,58 @@ def main(video_id: int, cam_width: int, cam_height: int, debug: bool) -> None:
         print(f"Error: Could not open camera with ID {video_id}")
         return
 
+    hand_detector = HandDetector()
+    recognizer = AsyncRecognizer()
+    window = DrawingWindow(recognizer=recognizer)
+    mouse = MouseMapper(window.width, window.height)
+
+    recorder = None
+    if record:
+        recorder = LandmarkRecorder(record, int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        print(f"Recording landmarks to {record}")
+
+    tracker = LatencyTracker() if debug or latency_log else None
+    window.latency_tracker = tracker
+    scheduler = IdleScheduler(idle_after, probe_every, probe_scale)
+
     def capture_loop(dt: float) -> None:
+        if not scheduler.should_detect():
+            cap.grab()  # Keep the camera buffer fresh without decoding so a wake-up sees a current frame
+            return
+        if tracker:
+            tracker.begin()
         ret, frame = cap.read()
         if not ret:
             return
         else:
+            if tracker:
+                tracker.mark("read")
+            raw_frame = frame
             # Flip frame
             frame = cv2.flip(frame, 1)
+            if tracker:
+                tracker.mark("flip")
 
         h, w = frame.shape[:2]
-        # Detect hand landmarks
-        right, left = hand_detector.detect_landmarks(frame) # ! Left and right are swapped due to the frame flipping
+        # Detect hand landmarks (landmarks are normalized so a downscaled probe frame yields the same coordinates)
+        detect_start = time.perf_counter()
+        detect_frame = frame if scheduler.scale == 1.0 else cv2.resize(frame, None, fx=scheduler.scale, fy=scheduler.scale, interpolation=cv2.INTER_AREA)
+        right, left = hand_detector.detect_landmarks(detect_frame) # ! Left and right are swapped due to the frame flipping
+        scheduler.update(bool(left or right), time.perf_counter() - detect_start)
+        if tracker:
+            tracker.mark("detect")
+        if recorder:
+            # Stored in detector order so a ReplayHandDetector returns the same tuple
+            recorder.write(time.time(), right, left, raw_frame if record_frames else None)
+            if tracker:
+                tracker.mark("record")
+        write_before = mouse.last_position_write
         mouse.process(left, right, use_right=True)
-
-        # If no hand is detected, clear the gesture queue
-        if not left and not right:
-            # gesture_queue.clear()
-            pass
+        if tracker:
+            tracker.mark("process")
+            if mouse.last_position_write != write_before:
+                tracker.mark("mouse_write", mouse.last_position_write)
+            tracker.end()
 
         if debug:
             # Draw landmarks on the frame
@@ -57,10 +97,23 @@ def main(video_id: int, cam_width: int, cam_height: int, debug: bool) -> None:
                     cv2.circle(frame, (x, y), 1, (255, 0, 0), -1)
                     if i == 0:
                         cv2.putText(frame, right.gesture, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 0), 1)
+            tracker.draw_overlay(frame)
+            if scheduler.idle:
+                cv2.putText(frame, "IDLE", (w - 60, 20), cv2.FONT_HERSHEY_PLAIN, 1.2, (0, 0, 255), 2)
 
         window.update_background(frame)
 
-    window.run(capture_loop)
+    try:
+        window.run(capture_loop)
+    finally:
+        if scheduler.enabled:
+            print(scheduler.summary())
+        if latency_log:
+            tracker.export(latency_log)
+            print(f"Exported {len(tracker.traces)} latency traces to {latency_log}")
+        if recorder:
+            recorder.close()
+            print(f"Recorded {recorder.count} frames to {record}")
     cap.release()
     cv2.destroyAllWindows()
 
@@ -1,4 +1,17 @@
 from .recognizer import Recognizer, AsyncRecognizer
-from .pyglet_gui import DrawingWindow
-from .gesture_ui import GestureSaverUI
-from .gesture_saver import GestureSaver
\ No newline at end of file
+from .gesture_saver import GestureSaver
+
+# GUI modules pull in pyglet, OpenCV and click, so they are only imported on first access
+_LAZY = {
+    "DrawingWindow": ".pyglet_gui",
+    "GestureSaverUI": ".gesture_ui",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
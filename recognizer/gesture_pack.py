@@ -0,0 +1,248 @@
+import json
+import os
+import struct
+import xml.etree.ElementTree as ET
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple
+import numpy as np
+import indexed_records
+
+# Packed gesture dataset, one pack per subject/speed (e.g. datasets/custom/s01/medium.gpk)
+#   <path>      "GPAK" magic and version, followed by append-only records
+#   <path>.idx  one little endian uint64 byte offset per record into <path>
+# Record layout:
+#   metadata length (uint32), number of points (uint32)
+#   metadata: utf-8 JSON object with the Wobbrock <Gesture> attributes (Name, Subject, Speed, Number, NumPts, ...)
+#   points: NumPts * (x, y) float32, times: NumPts * int32 milliseconds relative to the first point
+#   the absolute T of the first point (e.g. Wobbrock's logs) is kept as TimeOrigin in the metadata and restored on export
+PACK_EXTENSION = ".gpk"
+MAGIC = b"GPAK"
+VERSION = 1
+HEADER = struct.Struct("<4sH")
+RECORD_HEADER = struct.Struct("<II")
+OFFSET = struct.Struct("<Q")
+TIME_ORIGIN = "TimeOrigin"
+
+
+def pack_path(root: str, subject_folder: str, speed: str) -> str:
+    return os.path.join(root, subject_folder, speed + PACK_EXTENSION)
+
+
+def template_label(name: str) -> str:
+    """Strip the two digit sequence number from a gesture name (e.g. triangle01 -> triangle)."""
+    return name[:-2]
+
+
+class PackedGesture:
+    """A single gesture read from a pack. Points and times are read-only views into the memory-mapped file."""
+    __slots__ = ("meta", "points", "times")
+
+    def __init__(self, meta: Dict[str, str], points: np.ndarray, times: np.ndarray):
+        self.meta = meta
+        self.points = points
+        self.times = times
+
+    @property
+    def name(self) -> str:
+        return self.meta.get("Name", "")
+
+
+def repair_pack(path: str):
+    """Cut a torn trailing record (e.g. crash while saving) so new records aren't appended after garbage."""
+    indexed_records.repair(path, HEADER.size, GesturePackReader)
+
+
+class GesturePackWriter:
+    """Appends gestures to a pack file and its offset index. Each append is a single sequential write."""
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        repair_pack(path)
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._data: BinaryIO = open(path, "ab")
+        self._index: BinaryIO = open(path + ".idx", "ab")
+        if is_new:
+            self._data.write(HEADER.pack(MAGIC, VERSION))
+
+    def append(self, meta: Dict[str, str], points: np.ndarray, times: np.ndarray):
+        points = np.ascontiguousarray(points, dtype="<f4").reshape(-1, 2)
+        times = np.ascontiguousarray(times, dtype="<i4")
+        meta_bytes = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+        self._index.write(OFFSET.pack(self._data.tell()))
+        self._data.write(RECORD_HEADER.pack(len(meta_bytes), len(points)) + meta_bytes + points.tobytes() + times.tobytes())
+
+    def flush(self):
+        self._data.flush()
+        self._index.flush()
+
+    def close(self):
+        self._data.close()
+        self._index.close()
+
+    def __enter__(self) -> "GesturePackWriter":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+class GesturePackReader:
+    """Memory-mapped random access reader for gesture packs."""
+    def __init__(self, path: str):
+        self.path = path
+        self._data = np.memmap(path, dtype=np.uint8, mode="r") if os.path.getsize(path) else np.zeros(0, dtype=np.uint8)
+        if len(self._data) < HEADER.size:
+            raise ValueError(f"'{path}' is not a gesture pack.")
+        magic, version = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"'{path}' is not a gesture pack.")
+        if version != VERSION:
+            raise ValueError(f"Unsupported gesture pack version {version}.")
+        self.offsets = indexed_records.load_offsets(path, HEADER.size, self.record_end)
+
+    def record_end(self, pos: int) -> Optional[int]:
+        """Byte offset right after the record starting at pos, or None if the record is incomplete."""
+        if pos < HEADER.size or pos + RECORD_HEADER.size > len(self._data):
+            return None
+        meta_len, num_pts = RECORD_HEADER.unpack_from(self._data, pos)
+        end = pos + RECORD_HEADER.size + meta_len + num_pts * 12
+        return end if end <= len(self._data) else None
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def read_meta(self, i: int) -> Dict[str, str]:
+        """Read only the metadata of a record without touching its point data."""
+        pos = int(self.offsets[i])
+        meta_len, _ = RECORD_HEADER.unpack_from(self._data, pos)
+        start = pos + RECORD_HEADER.size
+        return json.loads(self._data[start:start + meta_len].tobytes())
+
+    def __getitem__(self, i: int) -> PackedGesture:
+        pos = int(self.offsets[i])
+        meta_len, num_pts = RECORD_HEADER.unpack_from(self._data, pos)
+        start = pos + RECORD_HEADER.size
+        meta = json.loads(self._data[start:start + meta_len].tobytes())
+        start += meta_len
+        points = np.frombuffer(self._data, dtype="<f4", count=num_pts * 2, offset=start).reshape(num_pts, 2)
+        times = np.frombuffer(self._data, dtype="<i4", count=num_pts, offset=start + num_pts * 8)
+        return PackedGesture(meta, points, times)
+
+    def __iter__(self) -> Iterator[PackedGesture]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def close(self):
+        """Release the memory map. Gestures read before stay valid until they are dropped."""
+        self._data = np.zeros(0, dtype=np.uint8)
+
+    def __enter__(self) -> "GesturePackReader":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def gesture_to_xml(meta: Dict[str, str], points: np.ndarray, times: np.ndarray) -> ET.ElementTree:
+    """Build a Wobbrock style <Gesture> tree. Times are shifted back by the TimeOrigin stored on import."""
+    origin = int(meta.get(TIME_ORIGIN, 0))
+    gesture_elem = ET.Element("Gesture", {key: str(value) for key, value in meta.items() if key != TIME_ORIGIN})
+    for (x, y), t in zip(points.tolist(), (np.asarray(times, dtype=np.int64) + origin).tolist()):
+        ET.SubElement(gesture_elem, "Point", {"X": str(int(x)), "Y": str(int(y)), "T": str(t)})
+    tree = ET.ElementTree(gesture_elem)
+    ET.indent(tree)
+    return tree
+
+
+def read_xml_gesture(file_path: str) -> Tuple[Dict[str, str], np.ndarray, np.ndarray]:
+    """Parse a Wobbrock style XML gesture into metadata, points and relative times.
+    A non-zero T of the first point is kept as TimeOrigin in the metadata."""
+    xml_root = ET.parse(file_path).getroot()
+    meta = dict(xml_root.attrib)
+    elements = xml_root.findall("Point")
+    points = np.array([[float(e.get("X")), float(e.get("Y"))] for e in elements], dtype=float).reshape(-1, 2)
+    times = np.array([int(e.get("T", 0)) for e in elements], dtype=np.int64)
+    if len(times) and times[0]:
+        meta[TIME_ORIGIN] = str(times[0])
+        times -= times[0]
+    return meta, points, times
+
+
+def xml_to_packs(xml_root: str, pack_root: str, overwrite: bool = False) -> int:
+    """Convert a <subject>/<speed>/<name>.xml tree into one fresh pack per subject/speed. Returns the gesture count.
+    Raises FileExistsError if a target pack already exists, unless overwrite is set (the pack is then replaced)."""
+    sources = []
+    for root, _, files in os.walk(xml_root):
+        xml_files = sorted(f for f in files if f.endswith(".xml"))
+        if not xml_files:
+            continue
+        speed_dir = os.path.relpath(root, xml_root)
+        if speed_dir == ".":
+            speed_dir = os.path.basename(os.path.abspath(xml_root))
+        sources.append((root, xml_files, os.path.join(pack_root, speed_dir + PACK_EXTENSION)))
+    # Check every target first so a refused import doesn't leave half of the packs written
+    existing = [pack_file for _, _, pack_file in sources if os.path.exists(pack_file)]
+    if existing and not overwrite:
+        raise FileExistsError(f"Pack already exists: {existing[0]}" + (f" (and {len(existing) - 1} more)" if len(existing) > 1 else ""))
+    count = 0
+    for root, xml_files, pack_file in sources:
+        for stale in (pack_file, pack_file + ".idx"):
+            if os.path.exists(stale):
+                os.remove(stale)
+        with GesturePackWriter(pack_file) as writer:
+            for file_name in xml_files:
+                meta, points, times = read_xml_gesture(os.path.join(root, file_name))
+                meta.setdefault("Name", file_name[:-4])
+                writer.append(meta, points, times)
+                count += 1
+    return count
+
+
+def packs_to_xml(pack_root: str, xml_root: str) -> int:
+    """Export every pack under pack_root back into the <subject>/<speed>/<name>.xml layout. Returns the gesture count."""
+    count = 0
+    for root, _, files in os.walk(pack_root):
+        for file_name in sorted(files):
+            if not file_name.endswith(PACK_EXTENSION):
+                continue
+            pack_file = os.path.join(root, file_name)
+            target_dir = os.path.join(xml_root, os.path.relpath(pack_file, pack_root)[:-len(PACK_EXTENSION)])
+            os.makedirs(target_dir, exist_ok=True)
+            for gesture in GesturePackReader(pack_file):
+                tree = gesture_to_xml(gesture.meta, gesture.points, gesture.times)
+                tree.write(os.path.join(target_dir, gesture.name + ".xml"), encoding="utf-8", xml_declaration=True)
+                count += 1
+    return count
+
+
+def main():
+    """Command line converter, click is only imported when it runs."""
+    import click
+
+    @click.group()
+    def cli():
+        """Convert between Wobbrock XML gesture logs and packed gesture datasets."""
+
+    @cli.command("import")
+    @click.argument("xml_root", type=click.Path(exists=True, file_okay=False))
+    @click.argument("pack_root", type=click.Path(file_okay=False))
+    @click.option("--overwrite", is_flag=True, help="Replace packs that already exist instead of refusing")
+    def import_xml(xml_root: str, pack_root: str, overwrite: bool):
+        """Pack an XML_ROOT/<subject>/<speed>/*.xml tree into PACK_ROOT/<subject>/<speed>.gpk."""
+        try:
+            count = xml_to_packs(xml_root, pack_root, overwrite)
+        except FileExistsError as e:
+            raise click.ClickException(f"{e}. Use --overwrite to replace it.")
+        print(f"Packed {count} gestures into {pack_root}")
+
+    @cli.command("export")
+    @click.argument("pack_root", type=click.Path(exists=True, file_okay=False))
+    @click.argument("xml_root", type=click.Path(file_okay=False))
+    def export_xml(pack_root: str, xml_root: str):
+        """Export PACK_ROOT/<subject>/<speed>.gpk into XML_ROOT/<subject>/<speed>/*.xml."""
+        print(f"Exported {packs_to_xml(pack_root, xml_root)} gestures to {xml_root}")
+
+    cli()
+
+
+if __name__ == "__main__":
+    main()
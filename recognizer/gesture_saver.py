@@ -1,11 +1,19 @@
+import atexit
 import os
+import queue
 import re
-import xml.etree.ElementTree as ET
+import threading
 from datetime import datetime
-from typing import List, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from recognizer.gesture_pack import GesturePackReader, GesturePackWriter, pack_path
 
 class GestureSaver:
-    def __init__(self):
+    """Keeps the save form state and writes strokes behind the UI on a background worker.
+
+    `schedule` (e.g. pyglet.clock.schedule_once) is used to hand completion messages back to the UI thread.
+    """
+    def __init__(self, schedule: Optional[Callable[[Callable[[float], None], float], None]] = None):
         self.input_text = ''
         self.input_active = False
         self.subject_text = ''
@@ -14,6 +22,13 @@ class GestureSaver:
         self.selected_speed = 1  # default to 'medium'
         self.save_message = ''
         self.save_label_text = 'Save'
+        self.dataset_root = os.path.join(os.path.dirname(__file__), '..', 'datasets', 'custom')
+        # Highest used number per pack and label, so saves only look at existing names once
+        self._numbers: Dict[str, Dict[str, int]] = {}
+        self.schedule = schedule
+        self._queue: "queue.Queue[Optional[_SaveRequest]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        atexit.register(self.close)
 
     def get_subject_folder(self):
         subject = self.subject_text.strip() or '1'
@@ -25,76 +40,149 @@ class GestureSaver:
     def get_save_dir(self):
         subject_folder = self.get_subject_folder()
         speed = self.get_speed()
-        return os.path.join(os.path.dirname(__file__), '..', 'datasets', 'custom', subject_folder, speed)
-
-    def get_next_filename(self, filename_base: str) -> Tuple[str, int]:
-        save_dir = self.get_save_dir()
-        os.makedirs(save_dir, exist_ok=True)
-        existing_files = os.listdir(save_dir)
-        pattern = re.compile(rf'^{re.escape(filename_base)}(\d+).xml$')
-        max_num = 0
-        for fname in existing_files:
-            m = pattern.match(fname)
-            if m:
-                num = int(m.group(1))
-                if num > max_num:
-                    max_num = num
-        next_num = max_num + 1
+        return os.path.join(self.dataset_root, subject_folder, speed)
+
+    def get_pack_path(self):
+        return pack_path(self.dataset_root, self.get_subject_folder(), self.get_speed())
+
+    def _load_names(self, pack_file: str) -> List[str]:
+        """Collect the gesture names in the pack and in legacy XML files next to it."""
+        names = []
+        if os.path.exists(pack_file) and os.path.getsize(pack_file) > 0:
+            reader = GesturePackReader(pack_file)
+            names += [reader.read_meta(i).get('Name', '') for i in range(len(reader))]
+        xml_dir = os.path.splitext(pack_file)[0]
+        if os.path.isdir(xml_dir):
+            names += [f[:-4] for f in os.listdir(xml_dir) if f.endswith('.xml')]
+        return names
+
+    def get_next_filename(self, filename_base: str, pack_file: Optional[str] = None) -> Tuple[str, int]:
+        pack_file = pack_file or self.get_pack_path()
+        numbers = self._numbers.get(pack_file)
+        if numbers is None:
+            numbers = self._numbers[pack_file] = {}
+        if filename_base not in numbers:
+            # Only the first save of a label per pack looks at existing names, later saves just count up
+            pattern = re.compile(rf'^{re.escape(filename_base)}(\d+)$')
+            matches = [pattern.match(name) for name in self._load_names(pack_file)]
+            numbers[filename_base] = max((int(m.group(1)) for m in matches if m), default=0)
+        next_num = numbers[filename_base] + 1
         filename = f"{filename_base}{next_num:02d}"
         return filename, next_num
 
     def save_gesture(self, filename_base: str, points: List[Tuple[float, float]], times: List[int]):
+        """Queue a stroke for saving. The write happens on a background worker and reports back via save_message."""
         if not points or len(points) < 2:
             self.save_message = 'No stroke to save.'
             return False
-        subject = self.subject_text.strip() or '1'
-        speed = self.get_speed()
-        save_dir = self.get_save_dir()
-        filename, next_num = self.get_next_filename(filename_base)
-        filepath = os.path.join(save_dir, filename + '.xml')
-        now = datetime.now()
-        duration = times[-1] - times[0] if len(times) > 1 else 0
-        gesture_elem = ET.Element('Gesture', {
+        request = _SaveRequest(
+            pack_file=self.get_pack_path(),
+            filename_base=filename_base,
+            subject=self.subject_text.strip() or '1',
+            speed=self.get_speed(),
+            points=list(points),
+            times=list(times),
+            created=datetime.now()
+        )
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._write_loop, name='GestureSaver', daemon=True)
+            self._worker.start()
+        self._queue.put(request)
+        self.save_message = f'Saving {filename_base}...'
+        return True
+
+    def flush(self):
+        """Block until every queued stroke has been written."""
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.join()
+
+    def close(self):
+        """Write all pending strokes and stop the worker."""
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.put(None)
+            self._worker.join()
+        self._worker = None
+
+    def _report(self, message: str):
+        def apply(dt=None):
+            self.save_message = message
+            self.save_label_text = 'Save'
+        if self.schedule:
+            self.schedule(apply, 0)
+        else:
+            apply()
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            # Drain whatever piled up meanwhile so each pack is opened once per batch
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            requests = [request for request in batch if request is not None]
+            try:
+                if requests:
+                    self._write_batch(requests)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _write_batch(self, requests: List["_SaveRequest"]):
+        by_pack: Dict[str, List[_SaveRequest]] = {}
+        for request in requests:
+            by_pack.setdefault(request.pack_file, []).append(request)
+        for pack_file, pack_requests in by_pack.items():
+            rel_path = os.path.relpath(pack_file, os.path.join(os.path.dirname(__file__), '..'))
+            try:
+                saved = []
+                # Resolve numbers before opening the writer so existing names are read from a consistent file
+                for request in pack_requests:
+                    self.get_next_filename(request.filename_base, pack_file)
+                with GesturePackWriter(pack_file) as writer:
+                    for request in pack_requests:
+                        filename, next_num = self.get_next_filename(request.filename_base, pack_file)
+                        writer.append(*request.to_record(filename, next_num))
+                        self._numbers[pack_file][request.filename_base] = next_num
+                        saved.append(filename)
+                self._report(f'Saved: {", ".join(saved)} to {rel_path}')
+            except Exception as e:
+                self._report(f'Error: {e}')
+
+
+class _SaveRequest:
+    """A stroke waiting to be written by the GestureSaver worker."""
+    __slots__ = ('pack_file', 'filename_base', 'subject', 'speed', 'points', 'times', 'created')
+
+    def __init__(self, pack_file: str, filename_base: str, subject: str, speed: str,
+                 points: List[Tuple[float, float]], times: List[int], created: datetime):
+        self.pack_file = pack_file
+        self.filename_base = filename_base
+        self.subject = subject
+        self.speed = speed
+        self.points = points
+        self.times = times
+        self.created = created
+
+    def to_record(self, filename: str, number: int) -> Tuple[Dict[str, str], np.ndarray, np.ndarray]:
+        duration = self.times[-1] - self.times[0] if len(self.times) > 1 else 0
+        meta = {
             'Name': filename,
-            'Subject': subject,
-            'Speed': speed,
-            'Number': str(next_num),
-            'NumPts': str(len(points)),
+            'Subject': self.subject,
+            'Speed': self.speed,
+            'Number': str(number),
+            'NumPts': str(len(self.points)),
             'Millseconds': str(duration),
             'AppName': 'Gestures',
             'AppVer': '1.0',
-            'Date': now.strftime('%A, %B %d, %Y'),
-            'TimeOfDay': now.strftime('%I:%M:%S %p')
-        })
-        t0 = times[0]
-        for (x, y), t in zip(points, times):
-            ET.SubElement(gesture_elem, 'Point', {
-                'X': str(int(x)),
-                'Y': str(int(y)),
-                'T': str(t - t0)
-            })
-        self._indent_xml(gesture_elem)
-        tree = ET.ElementTree(gesture_elem)
-        try:
-            tree.write(filepath, encoding='utf-8', xml_declaration=True)
-            rel_path = os.path.relpath(filepath, os.path.join(os.path.dirname(__file__), '..'))
-            self.save_message = f'Saved: {rel_path}'
-            self.save_label_text = 'Save'
-            return True
-        except Exception as e:
-            self.save_message = f'Error: {e}'
-            self.save_label_text = 'Save'
-            return False
-
-    def _indent_xml(self, elem: ET.Element, level=0):
-        i = "\n" + level*"  "
-        if len(elem):
-            if not elem.text or not elem.text.strip():
-                elem.text = i + "  "
-            for e in elem:
-                self._indent_xml(e, level+1)
-            if not e.tail or not e.tail.strip():
-                e.tail = i
-        else:
-            if level and (not elem.tail or not elem.tail.strip()):
-                elem.tail = i
+            'Date': self.created.strftime('%A, %B %d, %Y'),
+            'TimeOfDay': self.created.strftime('%I:%M:%S %p')
+        }
+        # Points are stored as integers like the Wobbrock XML logs
+        points = np.array(self.points, dtype=float).astype(int)
+        times = np.array(self.times, dtype=np.int64) - self.times[0]
+        return meta, points, times
@@ -0,0 +1,149 @@
+# Hot loops of the recognizer with an optional Numba backend.
+# The backend is picked at import time: Numba if it is installed, NumPy otherwise.
+# Set RECOGNIZER_KERNELS=numpy to force the NumPy implementation.
+# Numba itself is slow to import, so it is only loaded and compiled by warm_up() (called while templates load) or
+# on the first kernel call. If numba turns out to be broken (e.g. built against another numpy) NumPy is used instead.
+import importlib.util
+import os
+import threading
+from typing import Callable, Optional, Tuple
+import numpy as np
+
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
+
+
+def resample_numpy(points: np.ndarray, num_points: int) -> np.ndarray:
+    """Resample a path to num_points points spaced equally along its arc length."""
+    segment_lengths = np.sqrt(np.sum(np.diff(points, axis=0) ** 2, axis=1))
+    cumulative = np.concatenate(([0.0], np.cumsum(segment_lengths)))
+    targets = np.linspace(0.0, cumulative[-1], num_points)
+    return np.column_stack((np.interp(targets, cumulative, points[:, 0]), np.interp(targets, cumulative, points[:, 1])))
+
+
+def label_min_distances_numpy(candidate: np.ndarray, templates: np.ndarray, label_ids: np.ndarray, num_labels: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Per label minimum of the average point distance between candidate (n, 2) and templates (T, n, 2).
+
+    Returns the minimum distance and the index of the closest template for every label id.
+    """
+    distances = np.sqrt(np.sum((templates - candidate) ** 2, axis=2)).mean(axis=1)
+    min_distances = np.full(num_labels, np.inf)
+    np.minimum.at(min_distances, label_ids, distances)
+    # Templates sorted by label, then distance: the first template of each label is its closest one
+    order = np.lexsort((distances, label_ids))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = label_ids[order][1:] != label_ids[order][:-1]
+    min_indices = np.full(num_labels, -1, dtype=np.int64)
+    min_indices[label_ids[order][first]] = order[first]
+    return min_distances, min_indices
+
+
+_numba_kernels: Optional[Tuple[Callable, Callable]] = None
+
+
+def numba_kernels() -> Tuple[Callable, Callable]:
+    """Import numba and build the JIT compiled (resample, label_min_distances) kernels once."""
+    global _numba_kernels
+    if _numba_kernels is None:
+        import numba
+
+        @numba.njit(cache=True)
+        def resample_numba(points: np.ndarray, num_points: int) -> np.ndarray:
+            path_length = 0.0
+            for i in range(1, len(points)):
+                path_length += np.sqrt((points[i, 0] - points[i - 1, 0]) ** 2 + (points[i, 1] - points[i - 1, 1]) ** 2)
+            interval = path_length / (num_points - 1)
+            resampled = np.empty((num_points, 2))
+            resampled[0] = points[0]
+            count = 1
+            accumulated = 0.0
+            prev_x, prev_y = points[0, 0], points[0, 1]
+            i = 1
+            while i < len(points) and count < num_points:
+                x, y = points[i, 0], points[i, 1]
+                dist = np.sqrt((x - prev_x) ** 2 + (y - prev_y) ** 2)
+                if dist > 0.0 and accumulated + dist >= interval:
+                    t = (interval - accumulated) / dist
+                    prev_x = prev_x + t * (x - prev_x)
+                    prev_y = prev_y + t * (y - prev_y)
+                    resampled[count, 0] = prev_x
+                    resampled[count, 1] = prev_y
+                    count += 1
+                    accumulated = 0.0
+                else:
+                    accumulated += dist
+                    prev_x, prev_y = x, y
+                    i += 1
+            while count < num_points:
+                resampled[count] = points[len(points) - 1]
+                count += 1
+            return resampled
+
+        @numba.njit(cache=True)
+        def label_min_distances_numba(candidate: np.ndarray, templates: np.ndarray, label_ids: np.ndarray, num_labels: int):
+            n = candidate.shape[0]
+            min_distances = np.full(num_labels, np.inf)
+            min_indices = np.full(num_labels, -1, dtype=np.int64)
+            for t in range(templates.shape[0]):
+                label = label_ids[t]
+                # Early abandoning: stop summing once this template can't beat the best one of its label
+                limit = min_distances[label] * n
+                total = 0.0
+                for j in range(n):
+                    dx = candidate[j, 0] - templates[t, j, 0]
+                    dy = candidate[j, 1] - templates[t, j, 1]
+                    total += np.sqrt(dx * dx + dy * dy)
+                    if total >= limit:
+                        break
+                if total < limit:
+                    min_distances[label] = total / n
+                    min_indices[label] = t
+            return min_distances, min_indices
+
+        _numba_kernels = (resample_numba, label_min_distances_numba)
+    return _numba_kernels
+
+
+def _resample_lazy(points: np.ndarray, num_points: int) -> np.ndarray:
+    warm_up()
+    return resample(points, num_points)
+
+
+def _label_min_distances_lazy(candidate: np.ndarray, templates: np.ndarray, label_ids: np.ndarray, num_labels: int) -> Tuple[np.ndarray, np.ndarray]:
+    warm_up()
+    return label_min_distances(candidate, templates, label_ids, num_labels)
+
+
+_warm_up_lock = threading.Lock()
+
+
+def warm_up():
+    """Import numba and compile both kernels now instead of on the first call. No-op for the NumPy backend.
+
+    Falls back to the NumPy kernels with a warning if numba can't be imported or the kernels don't compile.
+    """
+    global BACKEND, resample, label_min_distances
+    with _warm_up_lock:
+        if resample is not _resample_lazy:
+            return
+        try:
+            resample_numba, label_min_distances_numba = numba_kernels()
+            # Same argument types as the Recognizer passes, so these are the signatures used later on
+            points = np.zeros((2, 2))
+            resample_numba(points, 2)
+            label_min_distances_numba(points, points[np.newaxis], np.zeros(1, dtype=np.int64), 1)
+        except Exception as e:
+            print(f"Warning: Numba kernels unavailable, falling back to NumPy ({type(e).__name__}: {e})")
+            BACKEND = "numpy"
+            resample, label_min_distances = resample_numpy, label_min_distances_numpy
+            return
+        resample, label_min_distances = resample_numba, label_min_distances_numba
+
+
+BACKEND = "numba" if NUMBA_AVAILABLE and os.environ.get("RECOGNIZER_KERNELS", "").lower() != "numpy" else "numpy"
+
+if BACKEND == "numba":
+    resample = _resample_lazy
+    label_min_distances = _label_min_distances_lazy
+else:
+    resample = resample_numpy
+    label_min_distances = label_min_distances_numpy
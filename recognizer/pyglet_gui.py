@@ -22,10 +22,16 @@ class DrawingWindow(pyglet.window.Window):
         self.pyglet_image = None  # Store the converted Pyglet image
         
         # Gesture Saving
-        self.gesture_saver = GestureSaver()
+        self.gesture_saver = GestureSaver(schedule=pyglet.clock.schedule_once)
         self.save_ui = GestureSaverUI(self.gesture_saver)
         self._mouse_buttons: Set[int] = set()
         self._mouse_x, self._mouse_y = 0, 0
+        
+        # Optional latency instrumentation, notified after every redraw
+        self.latency_tracker = None
+        self.last_point_time: Optional[float] = None  # perf_counter time the newest stroke point arrived
+        # Set when strokes are fed directly (e.g. from hand tracking), the mouse then only operates the UI
+        self.external_strokes = False
 
     def run(self, on_update: Optional[Callable[[float], None]] = None):
         """Run the Pyglet application."""
@@ -45,8 +51,7 @@ class DrawingWindow(pyglet.window.Window):
                 
                 # Only add if position changed (avoid duplicates)
                 if (x, y) != self.stroke_points[-1]:
-                    self.stroke_points.append((x, y))
-                    self.stroke_times.append(int(time.time() * 1000))
+                    self.add_stroke_point(x, y)
 
     def update_background(self, frame: np.ndarray):
         frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
@@ -83,29 +88,42 @@ class DrawingWindow(pyglet.window.Window):
                 
         self.label.draw()
         self.save_ui.draw()
+        if self.latency_tracker:
+            self.latency_tracker.on_redraw(self.last_point_time)
 
     def on_mouse_press(self, x, y, button, modifiers):
         # Delegate UI click handling to GestureUI
         handled = self.save_ui.handle_mouse_press(x, y, button, self.save_ui.speed_button_width, self.save_stroke)
-        if handled:
+        if handled or self.external_strokes:
             return
 
+        self.begin_stroke(x, y)
+        self._mouse_buttons = set([button])
+        self._mouse_x, self._mouse_y = x, y
+
+    def begin_stroke(self, x: float, y: float):
+        """Start a new stroke at the given window coordinates."""
         self.stroke_points = [(x, y)]
         self.stroke_times = [int(time.time() * 1000)]
+        self.last_point_time = time.perf_counter()
         self.label.text = "Drawing..."
         self.denorm_template = None
         self.last_stroke_points = []
         self.last_stroke_times = []
-        self._mouse_buttons = set([button])
-        self._mouse_x, self._mouse_y = x, y
+
+    def add_stroke_point(self, x: float, y: float):
+        """Append a point in window coordinates to the current stroke."""
+        self.stroke_points.append((x, y))
+        self.stroke_times.append(int(time.time() * 1000))
+        self.last_point_time = time.perf_counter()
 
     def on_mouse_drag(self, x, y, dx, dy, buttons, modifiers):
+        if self.external_strokes:
+            return
         # Only allow drawing if not interacting with input or save button
         if not self.gesture_saver.input_active and not (200 <= x <= 280 and 10 <= y <= 42):
             if buttons & mouse.LEFT:
-                import time
-                self.stroke_points.append((x, y))
-                self.stroke_times.append(int(time.time() * 1000))
+                self.add_stroke_point(x, y)
                 self._mouse_x, self._mouse_y = x, y
 
     def on_text(self, text):
@@ -114,6 +132,11 @@ class DrawingWindow(pyglet.window.Window):
     def on_key_press(self, symbol, modifiers):
         self.save_ui.handle_key_press(symbol)
 
+    def on_close(self):
+        # Write any strokes still queued before the window goes away
+        self.gesture_saver.close()
+        super().on_close()
+
     def save_stroke(self):
         # Save the current stroke if drawing, otherwise save the last recognized stroke
         points_to_save = self.stroke_points if self.stroke_points else getattr(self, 'last_stroke_points', [])
@@ -127,9 +150,15 @@ class DrawingWindow(pyglet.window.Window):
     def on_mouse_release(self, x: int, y: int, button: int, modifiers: int):
         self._mouse_buttons.discard(button)
 
-        if button != mouse.LEFT or len(self.stroke_points) <= 1:
+        if button != mouse.LEFT or self.external_strokes:
             return
-        
+        self.end_stroke()
+
+    def end_stroke(self):
+        """Finish the current stroke and run the recognizer on it."""
+        if len(self.stroke_points) <= 1:
+            return
+
         # Flip Y axis for pyglet (origin is bottom-left, but most gesture datasets use top-left)
         points_np = np.array(self.stroke_points, dtype=float)
         if points_np.shape[0] > 0:
@@ -150,8 +179,11 @@ class DrawingWindow(pyglet.window.Window):
 
 @click.command()
 @click.option("--async-loading", "-a", is_flag=True, help="Load templates asynchronously")
-def main(async_loading: bool):
-    recognizer_args = {}
+@click.option("--subject", "-s", "subjects", multiple=True, help="Only load templates of this subject (repeatable)")
+@click.option("--speed", "speeds", multiple=True, type=click.Choice(["fast", "medium", "slow"]), help="Only load templates of this speed (repeatable)")
+@click.option("--label", "-l", "labels", multiple=True, help="Only load templates with this label (repeatable)")
+def main(async_loading: bool, subjects: Tuple[str, ...], speeds: Tuple[str, ...], labels: Tuple[str, ...]):
+    recognizer_args = dict(subjects=subjects or None, speeds=speeds or None, labels=labels or None)
     recognizer = AsyncRecognizer(**recognizer_args) if async_loading else Recognizer(**recognizer_args)
     window = DrawingWindow(recognizer, width=600, height=400, caption="$1 Recognizer Demo")
     window.run()
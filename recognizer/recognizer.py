@@ -1,55 +1,63 @@
 import os
 import numpy as np
-import xml.etree.ElementTree as ET
-from typing import List, Tuple
+from typing import Iterable, List, Optional, Tuple
 import sys
 import threading
 import time
-from collections import defaultdict
+from recognizer import kernels
+from recognizer.gesture_pack import PACK_EXTENSION, GesturePackReader, read_xml_gesture
+from recognizer.template_catalog import TemplateCatalog
 
 DEFAULT_TEMPLATE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../datasets/xml_logs"))
 
         
 class Recognizer:
-    """Python implementation of the 1$ unistroke recognizer based on this pseudo code: https://depts.washington.edu/acelab/proj/dollar/dollar.pdf."""
-    def __init__(self, *, num_points: int = 64) -> None:
+    """Python implementation of the 1$ unistroke recognizer based on this pseudo code: https://depts.washington.edu/acelab/proj/dollar/dollar.pdf.
+    
+    Templates can be restricted to specific subjects, speeds and labels, resolved through the template catalog without reading unused point data.
+    """
+    def __init__(self, *, template_path: str = DEFAULT_TEMPLATE_PATH, num_points: int = 64, subjects: Optional[Iterable[str]] = None,
+                 speeds: Optional[Iterable[str]] = None, labels: Optional[Iterable[str]] = None) -> None:
         self.num_points = num_points
         self.templates: List[Tuple[str, np.ndarray]] = []
         self.loading = True
-        self._load_templates(DEFAULT_TEMPLATE_PATH, yield_to_main=False)
+        self._load_templates(template_path, yield_to_main=False, subjects=subjects, speeds=speeds, labels=labels)
 
-    def _load_templates(self, template_path: str, yield_to_main: bool = True):
-        xml_files = []
+    def _load_templates(self, template_path: str, yield_to_main: bool = True, subjects: Optional[Iterable[str]] = None,
+                        speeds: Optional[Iterable[str]] = None, labels: Optional[Iterable[str]] = None):
         if not os.path.exists(template_path):
             print(f"Warning: Template path '{template_path}' does not exist.")
-        for root, _, files in os.walk(template_path):
-            for file_name in files:
-                if file_name.endswith(".xml"):
-                    xml_files.append((root, file_name))
-        total = len(xml_files)
-        for idx, (root, file_name) in enumerate(xml_files, 1):
-            label = file_name.split(".")[0][:-2]
-            file_path = os.path.join(root, file_name)
-            xml_root = ET.parse(file_path).getroot()
-            points = []
-            for element in xml_root.findall("Point"):
-                x = float(element.get("X"))
-                y = float(element.get("Y"))
-                points.append([x, y])
-            points_array = np.array(points, dtype=float)
-            normalized_points, _ = self.normalize(points_array)
-            self.templates.append((label, normalized_points))
-            # Loading bar
-            if idx % 5 == 0 or idx == total:
-                bar_len = 30
-                filled_len = int(bar_len * idx // total)
-                bar = '=' * filled_len + '-' * (bar_len - filled_len)
-                sys.stdout.write(f"\rLoading gesture templates ({"Async" if yield_to_main else "Sync"}): [{bar}] {idx}/{total}")
-                sys.stdout.flush()
-            if yield_to_main:
-                time.sleep(0.001)  # Yield to main thread to reduce lag
+        # Compile the Numba kernels here (on the loading thread for AsyncRecognizer) rather than in the first recognize call
+        kernels.warm_up()
+        selected = TemplateCatalog.load(template_path).select(subjects, speeds, labels)
+        total = sum(len(entries) for entries in selected.values())
+        idx = 0
+        for rel_path, entries in selected.items():
+            file_path = os.path.join(template_path, rel_path)
+            if file_path.endswith(PACK_EXTENSION):
+                pack = GesturePackReader(file_path)
+                for entry in entries:
+                    idx += 1
+                    self._add_template(entry["label"], pack[entry["record"]].points, idx, total, yield_to_main)
+            else:
+                idx += 1
+                _, points, _ = read_xml_gesture(file_path)
+                self._add_template(entries[0]["label"], points, idx, total, yield_to_main)
         print()
 
+    def _add_template(self, label: str, points: np.ndarray, idx: int, total: int, yield_to_main: bool):
+        normalized_points, _ = self.normalize(points.astype(float))
+        self.templates.append((label, normalized_points))
+        # Loading bar
+        if idx % 5 == 0 or idx == total:
+            bar_len = 30
+            filled_len = int(bar_len * idx // total)
+            bar = '=' * filled_len + '-' * (bar_len - filled_len)
+            sys.stdout.write(f"\rLoading gesture templates ({"Async" if yield_to_main else "Sync"}): [{bar}] {idx}/{total}")
+            sys.stdout.flush()
+        if yield_to_main:
+            time.sleep(0.001)  # Yield to main thread to reduce lag
+
 
     def normalize(self, points: np.ndarray) -> Tuple[np.ndarray, dict]:
         """Normalize the input points to a fixed number of points, scale, rotate, and translate them."""
@@ -84,48 +92,15 @@ class Recognizer:
 
     def _resample(self, points: np.ndarray) -> np.ndarray:
         """Resample points to fixed number."""
-        points = points.tolist()
-        distances = np.sqrt(np.sum(np.diff(points, axis=0)**2, axis=1))
-        path_length = np.sum(distances)
-        interval = path_length / (self.num_points - 1)
-
-        resampled = [points[0]]
-        accumulated_distance = 0.0
-        i = 1
-        while i < len(points):
-            dist = np.linalg.norm(np.array(points[i]) - np.array(points[i - 1]))
-            if (accumulated_distance + dist) >= interval:
-                t = (interval - accumulated_distance) / dist
-                new_point = [
-                    points[i - 1][0] + t * (points[i][0] - points[i - 1][0]),
-                    points[i - 1][1] + t * (points[i][1] - points[i - 1][1])
-                ]
-                resampled.append(new_point)
-                points.insert(i, new_point)
-                accumulated_distance = 0.0
-                i += 1 
-            else:
-                accumulated_distance += dist
-                i += 1
-
-        while len(resampled) < self.num_points:
-            resampled.append(points[-1])
-
-        return np.array(resampled)
+        return kernels.resample(np.ascontiguousarray(points, dtype=float), self.num_points)
 
     def _rotate(self, points: np.ndarray, angle: float) -> np.ndarray:
         """Rotate points by given angle."""
         center = self._centroid(points)
-        new_points = []
         cos_angle = np.cos(angle)
         sin_angle = np.sin(angle)
-        for p in points:
-            px, py = p
-            cx, cy = center
-            qx = (px - cx) * cos_angle - (py - cy) * sin_angle + cx
-            qy = (px - cx) * sin_angle + (py - cy) * cos_angle + cy
-            new_points.append([qx, qy])
-        return np.array(new_points)
+        rotation = np.array([[cos_angle, sin_angle], [-sin_angle, cos_angle]])
+        return (points - center) @ rotation + center
 
     def _scale_to_square(self, points: np.ndarray, size: float) -> np.ndarray:
         """Scale points to fit into a square."""
@@ -152,27 +127,20 @@ class Recognizer:
         Returns the label, normalized template, denormalized template, and confidence (0-1).
         """
         normalized_points, params = self.normalize(points)
-        best_label, best_template, best_score = self.match(normalized_points)
-        denormalized_template = self.denormalize(best_template, params)
+        labels, min_dists, min_indices, templates = self._label_min_distances(normalized_points)
+        if not labels:
+            return "", normalized_points, np.array([]), 0.0
+        best = int(np.argmin(min_dists))
+        best_label = labels[best]
+        denormalized_template = self.denormalize(templates[min_indices[best]], params)
         
         # Softmax confidence over class min distances
-        label_min_dist = defaultdict(lambda: float('inf'))
-        for label, template in self.templates:
-            dist = self._path_distance(normalized_points, template)
-            if dist < label_min_dist[label]:
-                label_min_dist[label] = dist
-                
-        labels = list(label_min_dist.keys())
-        min_dists = np.array([label_min_dist[label] for label in labels])
-        
-        # Compute logits and probabilities
         logits = -min_dists  # negative distances
         exp_logits = np.exp(logits - np.max(logits)) 
     
         # Normalize to get probabilities
         probs = exp_logits / np.sum(exp_logits)
-        label_to_prob = dict(zip(labels, probs))
-        confidence = label_to_prob.get(best_label, 0.0)
+        confidence = probs[best]
         return best_label, normalized_points, denormalized_template, confidence
 
     # TODO: Possible enhancement but would differ from the original algorithm: sort by avg distance and return the most dominant label in the N lowest distance candidates
@@ -180,14 +148,39 @@ class Recognizer:
         """Match the candidate gesture against the templates.
         
         Returns the label of the best matching template, the template itself, and the distance score."""
-        best_score = float("inf")
-        best_template: Tuple[str, np.ndarray] = ("", np.array([]))
-        for label, template in self.templates:
-            dist = self._path_distance(candidate, template)
-            if dist < best_score:
-                best_score = dist
-                best_template = (label, template)
-        return best_template[0], best_template[1], best_score
+        labels, min_dists, min_indices, templates = self._label_min_distances(candidate)
+        if not labels:
+            return "", np.array([]), float("inf")
+        best = int(np.argmin(min_dists))
+        return labels[best], templates[min_indices[best]], float(min_dists[best])
+
+    def _label_min_distances(self, candidate: np.ndarray) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+        """Minimum path distance per label in one pass over all templates.
+        
+        Returns the labels, their minimum distances, the index of their closest template and the stacked templates."""
+        templates, label_ids, labels = self._template_stack()
+        if not labels:
+            return [], np.array([]), np.array([], dtype=np.int64), templates
+        min_dists, min_indices = kernels.label_min_distances(np.ascontiguousarray(candidate, dtype=float), templates, label_ids, len(labels))
+        return labels, min_dists, min_indices, templates
+
+    def _template_stack(self) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        """Templates as one (T, num_points, 2) array with label ids, rebuilt whenever templates were added."""
+        count = len(self.templates)
+        cached = getattr(self, "_stack_cache", None)
+        if cached is not None and cached[0] == count:
+            return cached[1]
+        templates = self.templates[:count]  # Snapshot, async loading may still be appending
+        labels: List[str] = []
+        label_index = {}
+        for label, _ in templates:
+            if label not in label_index:
+                label_index[label] = len(labels)
+                labels.append(label)
+        label_ids = np.array([label_index[label] for label, _ in templates], dtype=np.int64)
+        stack = np.array([template for _, template in templates], dtype=float).reshape(count, self.num_points, 2)
+        self._stack_cache = (count, (stack, label_ids, labels))
+        return self._stack_cache[1]
 
     def _path_distance(self, a: np.ndarray, b: np.ndarray) -> float:
         """Compute average distance between corresponding points."""
@@ -195,9 +188,10 @@ class Recognizer:
 
 class AsyncRecognizer(Recognizer):
     """Async Python implementation of the 1$ unistroke recognizer based on this pseudo code: https://depts.washington.edu/acelab/proj/dollar/dollar.pdf."""
-    def __init__(self, *, template_path: str = DEFAULT_TEMPLATE_PATH, num_points: int = 64) -> None:
+    def __init__(self, *, template_path: str = DEFAULT_TEMPLATE_PATH, num_points: int = 64, subjects: Optional[Iterable[str]] = None,
+                 speeds: Optional[Iterable[str]] = None, labels: Optional[Iterable[str]] = None) -> None:
         self.num_points = num_points
         self.templates: List[Tuple[str, np.ndarray]] = []
         self.loading = True
-        self._loading_thread = threading.Thread(target=self._load_templates, args=(template_path,), daemon=True)
+        self._loading_thread = threading.Thread(target=self._load_templates, args=(template_path,), kwargs=dict(subjects=subjects, speeds=speeds, labels=labels), daemon=True)
         self._loading_thread.start()
\ No newline at end of file
@@ -0,0 +1,130 @@
+import json
+import os
+import tempfile
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, List, Optional
+from recognizer.gesture_pack import PACK_EXTENSION, GesturePackReader, template_label
+
+CATALOG_FILE = ".template_catalog.json"
+CATALOG_VERSION = 1
+
+
+def normalize_subject(subject: str) -> str:
+    """Map subject ids like 's01', '01' and '1' onto the same key."""
+    subject = str(subject).strip().lower().lstrip("s")
+    return str(int(subject)) if subject.isdigit() else subject
+
+
+class TemplateCatalog:
+    """Persistent catalog of the gesture metadata under a template root.
+
+    Entries are built from the <Gesture> attributes (Name, Subject, Speed, NumPts, Millseconds) and the
+    <subject>/<speed> folder layout, so filters can be resolved without reading any point data. The catalog is
+    stored next to the templates and only files whose size or modification time changed are rescanned.
+    """
+    def __init__(self, root: str):
+        self.root = root
+        self.path = os.path.join(root, CATALOG_FILE)
+        self.files: Dict[str, dict] = {}  # relative path -> {"mtime", "size", "entries"}
+
+    @classmethod
+    def load(cls, root: str) -> "TemplateCatalog":
+        catalog = cls(root)
+        try:
+            with open(catalog.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == CATALOG_VERSION:
+                catalog.files = data["files"]
+        except (OSError, ValueError, KeyError):
+            pass
+        if catalog.refresh():
+            catalog.save()
+        return catalog
+
+    def refresh(self) -> bool:
+        """Rescan new or changed template files and drop removed ones. Returns whether anything changed."""
+        changed = False
+        seen = set()
+        for root, _, files in os.walk(self.root):
+            for file_name in files:
+                if not file_name.endswith((".xml", PACK_EXTENSION)):
+                    continue
+                file_path = os.path.join(root, file_name)
+                rel_path = os.path.relpath(file_path, self.root)
+                seen.add(rel_path)
+                stat = os.stat(file_path)
+                cached = self.files.get(rel_path)
+                if cached and cached["mtime"] == stat.st_mtime and cached["size"] == stat.st_size:
+                    continue
+                self.files[rel_path] = {"mtime": stat.st_mtime, "size": stat.st_size, "entries": self._scan(rel_path)}
+                changed = True
+        for rel_path in set(self.files) - seen:
+            del self.files[rel_path]
+            changed = True
+        return changed
+
+    def save(self):
+        # Written to a temporary file and swapped in, so processes refreshing the same catalog never see a partial file
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(prefix=CATALOG_FILE, suffix=".tmp", dir=self.root)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": CATALOG_VERSION, "files": self.files}, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # Read-only template directories just don't get a persistent catalog
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _scan(self, rel_path: str) -> List[dict]:
+        try:
+            return self._read_entries(rel_path)
+        except (OSError, ValueError, ET.ParseError, StopIteration) as e:
+            # E.g. a pack whose header was never written, it is rescanned once its size or mtime changes
+            print(f"Warning: Skipping unreadable template file '{rel_path}': {e or type(e).__name__}")
+            return []
+
+    def _read_entries(self, rel_path: str) -> List[dict]:
+        file_path = os.path.join(self.root, rel_path)
+        # Folder layout <subject>/<speed>/<name>.xml or <subject>/<speed>.gpk fills in missing attributes
+        parts = os.path.normpath(rel_path).split(os.sep)
+        if rel_path.endswith(PACK_EXTENSION):
+            folder = parts[:-1] + [parts[-1][:-len(PACK_EXTENSION)]]
+            reader = GesturePackReader(file_path)
+            metas = [reader.read_meta(i) for i in range(len(reader))]
+            return [self._entry(meta, meta.get("Name", ""), folder, i) for i, meta in enumerate(metas)]
+        # Only the root element is parsed, the points are never read
+        _, gesture = next(ET.iterparse(file_path, events=("start",)))
+        name = os.path.splitext(parts[-1])[0]
+        return [self._entry(gesture.attrib, name, parts[:-1], None)]
+
+    def _entry(self, attrib: Dict[str, str], name: str, folder: List[str], record: Optional[int]) -> dict:
+        subject = attrib.get("Subject") or (folder[-2] if len(folder) >= 2 else "")
+        speed = attrib.get("Speed") or (folder[-1] if folder else "")
+        return {
+            "name": name,
+            "label": template_label(name),
+            "subject": normalize_subject(subject) if subject else "",
+            "speed": speed.lower(),
+            "num_pts": int(attrib.get("NumPts", 0) or 0),
+            "milliseconds": int(attrib.get("Millseconds", 0) or 0),
+            "record": record,
+        }
+
+    def select(self, subjects: Optional[Iterable[str]] = None, speeds: Optional[Iterable[str]] = None,
+               labels: Optional[Iterable[str]] = None) -> Dict[str, List[dict]]:
+        """Return the matching entries grouped by relative file path. A filter of None matches everything."""
+        subject_set = {normalize_subject(s) for s in subjects} if subjects else None
+        speed_set = {s.lower() for s in speeds} if speeds else None
+        label_set = set(labels) if labels else None
+        selected: Dict[str, List[dict]] = {}
+        for rel_path, info in sorted(self.files.items()):
+            entries = [
+                e for e in info["entries"]
+                if (subject_set is None or e["subject"] in subject_set)
+                and (speed_set is None or e["speed"] in speed_set)
+                and (label_set is None or e["label"] in label_set)
+            ]
+            if entries:
+                selected[rel_path] = entries
+        return selected
@@ -0,0 +1,76 @@
+import time
+from typing import List, Optional, Tuple
+import click
+import cv2
+import numpy as np
+from pointing_input.landmark_recorder import LandmarkReader, ReplayCapture, ReplayHandDetector
+from pointing_input.mouse_mapper import MouseMapper
+
+
+class NullMouse:
+    """Stand-in for pynput.mouse.Controller that records instead of injecting OS events."""
+    def __init__(self):
+        self.position: Tuple[int, int] = (0, 0)
+        self.presses = 0
+        self.releases = 0
+
+    def press(self, button):
+        self.presses += 1
+
+    def release(self, button):
+        self.releases += 1
+
+
+@click.command()
+@click.argument("recording", type=click.Path(exists=True, dir_okay=False))
+@click.option("--detect", is_flag=True, help="Run the real HandDetector on recorded frames instead of replaying recorded landmarks")
+@click.option("--repeat", "-n", default=1, help="Number of passes over the recording", type=int, show_default=True)
+@click.option("--screen-width", default=1920, type=int, show_default=True)
+@click.option("--screen-height", default=1080, type=int, show_default=True)
+def main(recording: str, detect: bool, repeat: int, screen_width: int, screen_height: int) -> None:
+    """Replay a landmark recording through the capture -> detection -> MouseMapper pipeline as fast as possible."""
+    reader = LandmarkReader(recording)
+    cap = ReplayCapture(reader)
+    if not cap.isOpened():
+        print(f"Error: Recording '{recording}' is empty")
+        return
+    if detect:
+        from pointing_input.hand_detector import HandDetector
+        hand_detector = HandDetector()
+    else:
+        hand_detector = ReplayHandDetector(cap)
+
+    null_mouse = NullMouse()
+    latencies: List[float] = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        cap.position = -1
+        mouse = MouseMapper(reader.frame_width or 640, reader.frame_height or 480, controller=null_mouse, screen_size=(screen_width, screen_height))
+        while True:
+            t0 = time.perf_counter()
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frame = cv2.flip(frame, 1)
+            right, left = hand_detector.detect_landmarks(frame) # ! Left and right are swapped due to the frame flipping
+            mouse.process(left, right, use_right=True, now=cap.current.timestamp)
+            latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+    cap.release()
+
+    print_stats(latencies, elapsed)
+    print(f"Mouse: {null_mouse.presses} presses, {null_mouse.releases} releases, final position {null_mouse.position}")
+
+
+def print_stats(latencies: List[float], elapsed: float, label: Optional[str] = None):
+    if not latencies:
+        print("No frames processed")
+        return
+    ms = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    print(f"{label + ': ' if label else ''}{len(ms)} frames in {elapsed:.3f}s ({len(ms) / elapsed:.1f} fps)")
+    print(f"Latency ms: mean {ms.mean():.3f} | p50 {p50:.3f} | p95 {p95:.3f} | p99 {p99:.3f} | max {ms.max():.3f}")
+
+
+if __name__ == "__main__":
+    main()